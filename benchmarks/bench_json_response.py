@@ -0,0 +1,89 @@
+"""Serialising a 1k-item wish list page: FastAPI's default path vs FastJSONResponse.
+
+Drives two in-process routes through the ASGI app (no sockets, no database):
+one returns the WishListPage object and lets FastAPI run jsonable_encoder
+and JSONResponse, the other returns FastJSONResponse(page).
+
+    python -m benchmarks.bench_json_response --items 1000 --requests 200
+"""
+
+import argparse
+import asyncio
+import time
+from decimal import Decimal
+
+from fastapi import FastAPI
+
+from src.domain.entities import WishList
+from src.domain.models import WishListPage
+from src.presentation.models.wish_list import WishListPageResponse
+from src.presentation.responses import FastJSONResponse
+
+
+def build_app(page: WishListPage) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/default")
+    async def default():
+        return page
+
+    @app.get("/fast", response_model=WishListPageResponse)
+    async def fast():
+        return FastJSONResponse(page)
+
+    return app
+
+
+async def _run(app: FastAPI, path: str, requests: int) -> tuple[float, int]:
+    body_size = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal body_size
+        if message["type"] == "http.response.body":
+            body_size = len(message["body"])
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    await app(dict(scope), receive, send)
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - started) / requests, body_size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    page = WishListPage(
+        [
+            WishList(i, 1, f"wish {i}", "a fairly ordinary description", Decimal(i) / 4, None)
+            for i in range(args.items)
+        ],
+        args.items,
+    )
+    app = build_app(page)
+    for path in ("/default", "/fast"):
+        seconds, size = asyncio.run(_run(app, path, args.requests))
+        print(f"{path:>9}: {seconds * 1e3:7.2f} ms/request, {1 / seconds:7.0f} req/s, {size} B")
+
+
+if __name__ == "__main__":
+    main()
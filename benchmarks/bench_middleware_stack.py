@@ -0,0 +1,243 @@
+"""Per-request overhead of the presentation middleware stack, before and after.
+
+"before" is the BaseHTTPMiddleware stack the app used to run, kept below
+as it was; "after" is the pure ASGI stack of add_presentaion. Drives the
+ASGI app directly (no sockets, no TestClient) so that only the middlewares
+and the routing are measured. No database needed.
+
+    python -m benchmarks.bench_middleware_stack --requests 20000
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from collections import defaultdict, deque
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from src.presentation.handlers.middleware import RequestSizeLimitMiddleware
+from src.presentation.middleware.security_middleware import (
+    RateLimitMiddleware,
+    SecurityHeadersMiddleware,
+    SecurityLoggingMiddleware,
+)
+
+logger = logging.getLogger(__name__)
+
+# spread the load so that no client reaches the rate limit
+CLIENTS = 1000
+
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+
+        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-Frame-Options"] = "DENY"
+        response.headers["X-XSS-Protection"] = "1; mode=block"
+        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+
+        if request.url.path.startswith("/docs"):
+            response.headers["Content-Security-Policy"] = (
+                "default-src 'self'; "
+                "script-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
+                "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
+                "img-src 'self' https://fastapi.tiangolo.com; "
+                "font-src 'self' https://cdn.jsdelivr.net;"
+            )
+        else:
+            response.headers["Content-Security-Policy"] = (
+                "default-src 'self'; "
+                "script-src 'self' 'unsafe-inline'; "
+                "style-src 'self' 'unsafe-inline'"
+            )
+
+        return response
+
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app, requests_per_minute: int = 100, burst_limit: int = 20):
+        super().__init__(app)
+        self.requests_per_minute = requests_per_minute
+        self.burst_limit = burst_limit
+        self._requests = defaultdict(lambda: deque())
+        self._blocked_ips = set()
+
+    async def dispatch(self, request: Request, call_next):
+        client_ip = request.client.host if request.client else "unknown"
+        current_time = time.time()
+
+        if client_ip in self._requests:
+            while self._requests[client_ip] and current_time - self._requests[client_ip][0] > 60:
+                self._requests[client_ip].popleft()
+
+        if len(self._requests[client_ip]) >= self.requests_per_minute:
+            logger.warning(f"Rate limit exceeded for IP: {client_ip}")
+            return JSONResponse(
+                status_code=429,
+                content={
+                    "type": "https://wishlist.example.com/problems/rate-limit-exceeded",
+                    "title": "Rate Limit Exceeded",
+                    "status": 429,
+                    "detail": "Too many requests. Please try again later.",
+                    "correlation_id": str(int(current_time)),
+                },
+                headers={"Content-Type": "application/problem+json"},
+            )
+
+        recent_requests = [
+            req_time for req_time in self._requests[client_ip] if current_time - req_time < 10
+        ]
+        if len(recent_requests) >= self.burst_limit:
+            logger.warning(f"Burst limit exceeded for IP: {client_ip}")
+            return JSONResponse(
+                status_code=429,
+                content={
+                    "type": "https://wishlist.example.com/problems/burst-limit-exceeded",
+                    "title": "Burst Limit Exceeded",
+                    "status": 429,
+                    "detail": "Too many requests in short time. Please slow down.",
+                    "correlation_id": str(int(current_time)),
+                },
+                headers={"Content-Type": "application/problem+json"},
+            )
+
+        self._requests[client_ip].append(current_time)
+
+        response = await call_next(request)
+        return response
+
+
+class LegacySecurityLoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        client_ip = request.client.host if request.client else "unknown"
+
+        if self._is_suspicious_request(request):
+            logger.warning(f"Suspicious request from {client_ip}: {request.method} {request.url}")
+
+        response = await call_next(request)
+
+        if response.status_code >= 400:
+            logger.warning(
+                f"Error response {response.status_code} "
+                f"for {request.method} {request.url} from {client_ip}"
+            )
+
+        content_length = request.headers.get("content-length")
+        if content_length and int(content_length) > 1000000:
+            logger.info(f"Large request ({content_length} bytes) from {client_ip}")
+
+        return response
+
+    def _is_suspicious_request(self, request: Request) -> bool:
+        suspicious_patterns = ["..", "<script", "union select", "javascript:", "eval("]
+        url_str = str(request.url).lower()
+        for pattern in suspicious_patterns:
+            if pattern in url_str:
+                return True
+        return False
+
+
+class LegacyRequestSizeLimitMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app, max_body_size: int) -> None:
+        super().__init__(app)
+        self.max_body_size = max_body_size
+
+    async def dispatch(self, request, call_next):
+        content_length = request.headers.get("content-length")
+
+        if content_length and content_length.isdigit():
+            if int(content_length) > self.max_body_size:
+                return PlainTextResponse("Request payload too large", status_code=413)
+
+        return await call_next(request)
+
+
+STACKS = {
+    "bare": None,
+    "before": (
+        LegacySecurityLoggingMiddleware,
+        LegacyRateLimitMiddleware,
+        LegacySecurityHeadersMiddleware,
+        LegacyRequestSizeLimitMiddleware,
+    ),
+    "after": (
+        SecurityLoggingMiddleware,
+        RateLimitMiddleware,
+        SecurityHeadersMiddleware,
+        RequestSizeLimitMiddleware,
+    ),
+}
+
+
+def build_app(stack: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return PlainTextResponse("pong")
+
+    middlewares = STACKS[stack]
+    if middlewares is not None:
+        # same order as add_presentaion
+        logging_, rate_limit, headers, size_limit = middlewares
+        app.add_middleware(logging_)
+        app.add_middleware(rate_limit, requests_per_minute=100, burst_limit=50)
+        app.add_middleware(headers)
+        app.add_middleware(size_limit, max_body_size=1_048_576)
+    return app
+
+
+async def _run(app: FastAPI, requests: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    def scope(i: int) -> dict:
+        return {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/ping",
+            "raw_path": b"/ping",
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(b"host", b"bench"), (b"user-agent", b"bench")],
+            "client": (f"10.0.{i % CLIENTS // 256}.{i % 256}", 50000),
+            "server": ("bench", 80),
+            "app": app,
+        }
+
+    # warm-up builds the middleware stack
+    await app(scope(0), receive, send)
+    started = time.perf_counter()
+    for i in range(requests):
+        await app(scope(i), receive, send)
+    return (time.perf_counter() - started) / requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    bare = asyncio.run(_run(build_app("bare"), args.requests))
+    print(f"bare app: {bare * 1e6:8.1f} us/request")
+    for stack in ("before", "after"):
+        seconds = asyncio.run(_run(build_app(stack), args.requests))
+        print(
+            f"{stack:>8}: {seconds * 1e6:8.1f} us/request, "
+            f"stack overhead {(seconds - bare) * 1e6:8.1f} us/request"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Building a 422 problem response: pydantic model + JSONResponse vs ProblemType.
+
+    python -m benchmarks.bench_problem_responses --iterations 100000
+"""
+
+import argparse
+import time
+
+from fastapi.responses import JSONResponse
+
+from src.presentation.models.rfc7807 import create_security_problem_detail
+from src.presentation.problems import ProblemType
+
+TYPE = "https://wishlist.example.com/problems/validation-error"
+DETAIL = "body -> password: Field required"
+INSTANCE = "http://localhost/api/auth/register"
+PROBLEM = ProblemType(TYPE, "Validation Error", 422)
+
+
+def model_response() -> JSONResponse:
+    problem = create_security_problem_detail(
+        status=422, title="Validation Error", detail=DETAIL, type_=TYPE, instance=INSTANCE
+    )
+    return JSONResponse(
+        status_code=422,
+        content=problem.model_dump(exclude_none=True),
+        headers={"Content-Type": "application/problem+json"},
+    )
+
+
+def template_response():
+    return PROBLEM.response(DETAIL, INSTANCE)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=100_000)
+    args = parser.parse_args()
+
+    for build in (model_response, template_response):
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            build()
+        seconds = (time.perf_counter() - started) / args.iterations
+        print(f"{build.__name__:>17}: {seconds * 1e6:6.2f} µs/response")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Row-to-entity mapping: attribute-by-attribute __dict__ objects vs slotted dataclasses.
+
+Pure Python, no database needed. psycopg's args_row(WishList) calls
+WishList(*row) for each fetched row, which is what the "slotted" case measures.
+
+    python -m benchmarks.bench_row_mapping --rows 100000
+"""
+
+import argparse
+import time
+import tracemalloc
+from decimal import Decimal
+from typing import Callable, Optional
+
+from src.domain.entities import WishList
+
+
+class LegacyWishList:
+    """Shape of the entity before it became a slotted dataclass."""
+
+    wish_list_id: int
+    user_id: int
+    title: str
+    description: str
+    estimate_price: Decimal
+    link: Optional[str]
+
+
+def map_legacy(rows: list[tuple]) -> list[LegacyWishList]:
+    result: list[LegacyWishList] = []
+    for r in rows:
+        item = LegacyWishList()
+        item.wish_list_id = r[0]
+        item.user_id = r[1]
+        item.title = r[2]
+        item.description = r[3]
+        item.estimate_price = r[4]
+        item.link = r[5]
+        result.append(item)
+    return result
+
+
+def map_slotted(rows: list[tuple]) -> list[WishList]:
+    return [WishList(*r) for r in rows]
+
+
+def _rows(count: int) -> list[tuple]:
+    return [(i, i % 100, f"wish {i}", "description", Decimal(i % 500), None) for i in range(count)]
+
+
+def _measure(name: str, mapper: Callable[[list[tuple]], list], rows: list[tuple]) -> None:
+    best = min(_timed(mapper, rows) for _ in range(5))
+    # row values are shared by both mappers, so this is the per-entity overhead
+    tracemalloc.start()
+    entities = mapper(rows)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del entities
+    print(
+        f"{name:<8} {len(rows) / best:>12,.0f} rows/s   " f"{size / len(rows):>6.1f} bytes/entity"
+    )
+
+
+def _timed(mapper: Callable[[list[tuple]], list], rows: list[tuple]) -> float:
+    start = time.perf_counter()
+    mapper(rows)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+    rows = _rows(args.rows)
+    _measure("legacy", map_legacy, rows)
+    _measure("slotted", map_slotted, rows)
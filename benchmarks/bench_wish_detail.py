@@ -0,0 +1,83 @@
+"""Compare the two-query detailed wish fetch with the single-query one.
+
+Needs a migrated database reachable through the usual DB_* variables:
+
+    python -m benchmarks.bench_wish_detail --notes 20 --iterations 500
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from decimal import Decimal
+
+import dotenv
+
+from src.domain.models import WishListCreate, WishNoteCreate
+from src.infrastructure.persistence import db
+from src.infrastructure.persistence.wish_list import WishListStorage, WishNotesStorage
+
+BENCH_USER_ID = -1
+
+
+async def _seed(wishes: WishListStorage, notes_count: int) -> int:
+    wish = WishListCreate()
+    wish.user_id = BENCH_USER_ID
+    wish.title = "benchmark"
+    wish.description = "benchmark wish"
+    wish.estimate_price = Decimal("100.00")
+    notes = []
+    for i in range(notes_count):
+        note = WishNoteCreate()
+        note.title = f"note {i}"
+        note.description = "x" * 64
+        note.received = i % 2 == 0
+        notes.append(note)
+    return await wishes.create_with_notes(wish, notes)
+
+
+async def _two_queries(wishes: WishListStorage, notes: WishNotesStorage, wish_id: int) -> None:
+    wish = await wishes.get_by_id(wish_id)
+    assert wish is not None and wish.user_id == BENCH_USER_ID
+    await notes.get_all_by_wish_id(wish_id)
+
+
+async def _one_query(wishes: WishListStorage, wish_id: int) -> None:
+    assert await wishes.get_detailed(wish_id, BENCH_USER_ID) is not None
+
+
+async def _measure(name: str, fn, iterations: int) -> None:
+    for _ in range(min(iterations, 20)):  # warm up pool and plans
+        await fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(
+        f"{name:<12} mean={statistics.fmean(samples):.3f}ms "
+        f"p50={statistics.median(samples):.3f}ms p99={p99:.3f}ms"
+    )
+
+
+async def main(notes_count: int, iterations: int) -> None:
+    wishes, notes = WishListStorage(), WishNotesStorage()
+    wish_id = await _seed(wishes, notes_count)
+    try:
+        print(f"wish with {notes_count} notes, {iterations} iterations")
+        await _measure("two queries", lambda: _two_queries(wishes, notes, wish_id), iterations)
+        await _measure("one query", lambda: _one_query(wishes, wish_id), iterations)
+    finally:
+        await wishes.delete(wish_id, BENCH_USER_ID)
+        await db.close_pool()
+
+
+if __name__ == "__main__":
+    dotenv.load_dotenv()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--notes", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.notes, args.iterations))
@@ -0,0 +1,81 @@
+from functools import lru_cache
+
+from src.infrastructure.password_hasher import PasswordHasher
+from src.infrastructure.persistence.auth import RefreshTokensRepository, UsersRepository
+from src.infrastructure.persistence.notifications import (
+    USER_BLOCK_CHANNEL,
+    WISH_LIST_CHANNEL,
+    NotificationListener,
+)
+from src.infrastructure.persistence.wish_list import WishListStorage, WishNotesStorage
+from src.infrastructure.rate_limit.base import Limit, RateLimiter
+from src.infrastructure.rate_limit.memory import InMemoryRateLimiter
+from src.infrastructure.rate_limit.postgres import PostgresRateLimiter
+from src.infrastructure.rate_limit.shared_memory import SharedMemoryRateLimiter
+from src.infrastructure.settings import Settings, get_settings
+from src.infrastructure.wish_list_cache import (
+    InMemoryWishListCache,
+    NullWishListCache,
+    WishListCache,
+)
+from src.use_cases.auth import AuthService
+from src.use_cases.wish_list import WishListService
+
+
+class Container:
+    """Composition root: app-lifetime repositories and services.
+
+    Everything here is stateless per request, so one instance of each is
+    shared by all requests instead of being rebuilt by Depends() each time.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self.settings = settings
+        self.users_repository = UsersRepository()
+        self.refresh_tokens_repository = RefreshTokensRepository()
+        self.wish_list_storage = WishListStorage()
+        self.wish_notes_storage = WishNotesStorage()
+        self.password_hasher = PasswordHasher(
+            settings.password_hash_workers, settings.password_hash_queue
+        )
+        self.auth_service = AuthService(
+            self.users_repository, self.refresh_tokens_repository, self.password_hasher, settings
+        )
+        self.user_block_listener = NotificationListener(
+            USER_BLOCK_CHANNEL,
+            self.auth_service.on_user_block_changed,
+            self.auth_service.clear_user_cache,
+        )
+        self.wish_list_cache = create_wish_list_cache(settings)
+        self.wish_list_listener = NotificationListener(
+            WISH_LIST_CHANNEL, self.wish_list_cache.on_notify, self.wish_list_cache.clear
+        )
+        self.wish_list_service = WishListService(
+            self.wish_list_storage, self.wish_notes_storage, self.wish_list_cache
+        )
+        self.rate_limiter = create_rate_limiter(settings)
+
+
+def create_rate_limiter(settings: Settings) -> RateLimiter:
+    limits = {
+        "rate": Limit(settings.rate_limit_per_minute, 60),
+        "burst": Limit(settings.rate_limit_burst, 10),
+    }
+    if settings.rate_limit_backend == "memory":
+        return InMemoryRateLimiter(limits)
+    if settings.rate_limit_backend == "shm":
+        return SharedMemoryRateLimiter(settings.rate_limit_shm_path, limits)
+    if settings.rate_limit_backend == "postgres":
+        return PostgresRateLimiter(limits, processes=settings.rate_limit_processes)
+    raise ValueError(f"unknown RATE_LIMIT_BACKEND: {settings.rate_limit_backend}")
+
+
+def create_wish_list_cache(settings: Settings) -> WishListCache:
+    if not settings.wish_cache_enabled:
+        return NullWishListCache()
+    return InMemoryWishListCache(settings.wish_cache_size, settings.wish_cache_ttl_seconds)
+
+
+@lru_cache(maxsize=1)
+def get_container() -> Container:
+    return Container(get_settings())
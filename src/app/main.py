@@ -1,16 +1,43 @@
+from contextlib import asynccontextmanager
+
 import dotenv
 from fastapi import FastAPI
 
-from src import presentation
-from src.presentation.openapi import custom_openapi
-
+# before any src import: settings are read once, on first use
 dotenv.load_dotenv()
 
+from src import presentation  # noqa: E402
+from src.app.container import get_container  # noqa: E402
+from src.infrastructure.persistence import db, migrations  # noqa: E402
+from src.presentation.openapi import custom_openapi  # noqa: E402
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    container = get_container()
+    await db.open_pool()
+    if container.settings.db_migrate_on_startup:
+        await migrations.run_migrations()
+    if container.settings.auth_middleware_enabled:
+        await container.user_block_listener.start()
+    if container.settings.wish_cache_enabled:
+        await container.wish_list_listener.start()
+    try:
+        yield
+    finally:
+        await container.user_block_listener.stop()
+        await container.wish_list_listener.stop()
+        await container.rate_limiter.close()
+        container.password_hasher.close()
+        await db.close_pool()
+
+
 app = FastAPI(
     title="Wishlist App",
     version="0.1.0",
     description="Simple Wishlist API with JWT auth, user management and wishes CRUD.",
     swagger_ui_parameters={"persistAuthorization": True},
+    lifespan=lifespan,
 )
 
 presentation.add_presentaion(app)
@@ -2,13 +2,14 @@ from dataclasses import dataclass
 from datetime import datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class User:
     user_id: int | None = None
     email: str | None = None
     password_hash: str | None = None
     created_at: datetime | None = None
     blocked_until: datetime | None = None
+    failed_attempts: int | None = None
 
 
 @dataclass
@@ -21,3 +22,9 @@ class UserCreate:
 class UserPublic:
     user_id: int
     email: str
+
+
+@dataclass
+class TokenPair:
+    access_token: str
+    refresh_token: str
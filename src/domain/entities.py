@@ -1,7 +1,9 @@
+from dataclasses import dataclass
 from decimal import Decimal
 from typing import Optional
 
 
+@dataclass(slots=True)
 class WishList:
     wish_list_id: int
     user_id: int
@@ -11,6 +13,7 @@ class WishList:
     link: Optional[str]
 
 
+@dataclass(slots=True)
 class WishNote:
     wish_note_id: int
     wish_list_id: int
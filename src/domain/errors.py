@@ -6,3 +6,24 @@ class WishNotFoundError(Exception):
 
     def __str__(self):
         return f"{self.message}: wish_id = {self.wish_id}"
+
+
+class ServiceOverloadedError(Exception):
+    def __init__(self, resource, retry_after: int, message="Service Overloaded"):
+        self.resource = resource
+        self.retry_after = retry_after
+        self.message = message
+        super().__init__(self.message)
+
+    def __str__(self):
+        return f"{self.message}: {self.resource} is at capacity, retry in {self.retry_after} s"
+
+
+class WishVersionMismatchError(Exception):
+    def __init__(self, wish_id, message="Wish Was Modified"):
+        self.wish_id = wish_id
+        self.message = message
+        super().__init__(self.message)
+
+    def __str__(self):
+        return f"{self.message}: wish_id = {self.wish_id} changed since it was read"
@@ -1,9 +1,11 @@
+from dataclasses import dataclass
 from decimal import Decimal
 from typing import Optional
 
-from .entities import WishNote
+from .entities import WishList, WishNote
 
 
+@dataclass(slots=True)
 class WishListDetailed:
     wish_list_id: int
     user_id: int
@@ -14,6 +16,20 @@ class WishListDetailed:
     notes: list[WishNote]
 
 
+@dataclass(slots=True)
+class VersionedWishList:
+    version: int
+    # None when the caller already holds this version: the notes were not read
+    wish: Optional[WishListDetailed]
+
+
+@dataclass(slots=True)
+class WishListPage:
+    items: list[WishList]
+    # wish_list_id to pass as the cursor of the next page; None on the last page
+    next_cursor: Optional[int]
+
+
 class WishListCreate:
     user_id: int
     title: str
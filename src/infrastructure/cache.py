@@ -0,0 +1,78 @@
+"""Bounded in-process cache with per-entry expiry."""
+
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """LRU cache whose entries also expire after their own TTL.
+
+    max_size bounds the number of entries or, given weigh, the sum of
+    weigh(value) over them. A value is weighed when it is set: one that is
+    changed in place must be set again for its new weight to count.
+
+    Not thread-safe: meant to be used from the event loop only.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        clock: Callable[[], float] = time.monotonic,
+        weigh: Optional[Callable[[V], int]] = None,
+    ) -> None:
+        self._max_size = max_size
+        self._clock = clock
+        self._weigh = weigh
+        # key -> (expires_at, value, weight), least recently used first
+        self._entries: OrderedDict[K, tuple[float, V, int]] = OrderedDict()
+        self._weight = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def weight(self) -> int:
+        return self._weight
+
+    def get(self, key: K, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        expires_at, value, _ = entry
+        if expires_at <= self._clock():
+            self.invalidate(key)
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, ttl: float) -> None:
+        self.invalidate(key)
+        weight = 1 if self._weigh is None else self._weigh(value)
+        if ttl <= 0 or weight > self._max_size:
+            return
+        self._entries[key] = (self._clock() + ttl, value, weight)
+        self._weight += weight
+        while self._weight > self._max_size:
+            _, (_, _, evicted) = self._entries.popitem(last=False)
+            self._weight -= evicted
+
+    def invalidate(self, key: K) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._weight -= entry[2]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._weight = 0
+
+    def stats(self) -> dict[str, int]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -1,144 +1,235 @@
-import os
-from typing import Any, Optional
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
 
 import psycopg
-from passlib.context import CryptContext
+from psycopg.rows import args_row
 
-from src.domain.auth import User, UserCreate
+from src.domain.auth import User
+from src.infrastructure.persistence.db import connection
+from src.infrastructure.persistence.notifications import USER_BLOCK_CHANNEL
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
-def _get_conn() -> psycopg.Connection[Any]:
-    host = os.getenv("DB_HOST", "localhost")
-    port = int(os.getenv("DB_PORT", "5432"))
-    dbname = os.getenv("DB_NAME", "wishlist")
-    user = os.getenv("DB_USER", "wishlist")
-    password = os.getenv("DB_PASSWORD", "wishlist")
-    print(host, port, dbname, user, password)
-    return psycopg.connect(host=host, port=port, dbname=dbname, user=user, password=password)
-
-
-def _ensure_schema() -> None:
-    with _get_conn() as conn, conn.cursor() as cur:
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS users (
-                user_id SERIAL PRIMARY KEY,
-                email TEXT NOT NULL UNIQUE,
-                password_hash TEXT NOT NULL,
-                created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
-                blocked_until TIMESTAMPTZ,
-                failed_attempts INTEGER NOT NULL DEFAULT 0
-            );
-            """
-        )
-        conn.commit()
+logger = logging.getLogger(__name__)
 
 
 class UsersRepository:
-    def __init__(self) -> None:
-        _ensure_schema()
-
-    def get_by_email(self, email: str) -> Optional[User]:
-        with _get_conn() as conn, conn.cursor() as cur:
-            cur.execute(
+    async def get_by_email(self, email: str) -> Optional[User]:
+        async with connection() as conn, conn.cursor(row_factory=args_row(User)) as cur:
+            await cur.execute(
                 """
                 SELECT
-                user_id, email, password_hash, created_at, blocked_until
+                user_id, email, password_hash, created_at, blocked_until, failed_attempts
                 FROM users
                 WHERE email = %s
                 """,
                 (email,),
             )
-            row = cur.fetchone()
-        if row is None:
-            return None
-        user = User()
-        user.user_id = row[0]
-        user.email = row[1]
-        user.password_hash = row[2]
-        user.created_at = row[3]
-        user.blocked_until = row[4]
-        return user
-
-    def get_by_id(self, user_id: int) -> Optional[User]:
-        with _get_conn() as conn, conn.cursor() as cur:
-            cur.execute(
+            return await cur.fetchone()
+
+    async def get_by_id(self, user_id: int) -> Optional[User]:
+        async with connection() as conn, conn.cursor(row_factory=args_row(User)) as cur:
+            await cur.execute(
                 """
                 SELECT
-                user_id, email, password_hash, created_at, blocked_until
+                user_id, email, password_hash, created_at, blocked_until, failed_attempts
                 FROM users
                 WHERE user_id = %s
                 """,
                 (user_id,),
             )
-            row = cur.fetchone()
-        if row is None:
-            return None
-        user = User()
-        user.user_id = row[0]
-        user.email = row[1]
-        user.password_hash = row[2]
-        user.created_at = row[3]
-        user.blocked_until = row[4]
-        return user
-
-    def create(self, data: UserCreate) -> int:
-        password_hash = pwd_context.hash(data.password)
-        with _get_conn() as conn, conn.cursor() as cur:
-            cur.execute(
+            return await cur.fetchone()
+
+    async def create(self, email: str, password_hash: str) -> Optional[int]:
+        """Insert a user; None when the email is already registered."""
+        async with connection() as conn, conn.cursor() as cur:
+            await cur.execute(
                 """
                 INSERT INTO users
                 (email, password_hash)
                 VALUES
                 (%s, %s)
+                ON CONFLICT (email) DO NOTHING
                 RETURNING user_id
                 """,
-                (data.email, password_hash),
+                (email, password_hash),
             )
-            new_id = cur.fetchone()[0]
-            conn.commit()
-        return int(new_id)
-
-    def verify_password(self, plain_password: str, password_hash: str) -> bool:
-        return pwd_context.verify(plain_password, password_hash)
-
-    def set_block_until(self, user_id: int, blocked_until) -> None:
-        with _get_conn() as conn, conn.cursor() as cur:
-            cur.execute(
+            row = await cur.fetchone()
+            await conn.commit()
+        return int(row[0]) if row else None
+
+    async def set_block_until(self, user_id: int, blocked_until) -> None:
+        # the notification is delivered to listeners on commit
+        async with connection() as conn, conn.cursor() as cur:
+            await cur.execute(
                 """
-                UPDATE users
-                SET blocked_until = %s
-                WHERE user_id = %s
+                WITH updated AS (
+                    UPDATE users
+                    SET blocked_until = %s
+                    WHERE user_id = %s
+                    RETURNING user_id
+                )
+                SELECT pg_notify(%s, user_id::text) FROM updated
                 """,
-                (blocked_until, user_id),
+                (blocked_until, user_id, USER_BLOCK_CHANNEL),
             )
-            conn.commit()
-
-    def increment_failed_attempts(self, user_id: int) -> int:
-        with _get_conn() as conn, conn.cursor() as cur:
-            cur.execute(
+            await conn.commit()
+
+    async def record_failed_login(
+        self, user_id: int, max_attempts: int, block_for: timedelta
+    ) -> bool:
+        """Count a failed login; the max_attempts-th one in a row blocks the user.
+
+        Returns True when this attempt blocked the user. The counter restarts
+        from zero once the block is set.
+        """
+        async with connection() as conn, conn.cursor() as cur:
+            await cur.execute(
+                """
+                WITH updated AS (
+                    UPDATE users
+                    SET failed_attempts = CASE
+                            WHEN failed_attempts + 1 >= %(max_attempts)s THEN 0
+                            ELSE failed_attempts + 1
+                        END,
+                        blocked_until = CASE
+                            WHEN failed_attempts + 1 >= %(max_attempts)s THEN now() + %(block_for)s
+                            ELSE blocked_until
+                        END
+                    WHERE user_id = %(user_id)s
+                    RETURNING user_id, failed_attempts = 0 AS blocked
+                )
+                SELECT blocked, CASE WHEN blocked THEN pg_notify(%(channel)s, user_id::text) END
+                FROM updated
+                """,
+                {
+                    "user_id": user_id,
+                    "max_attempts": max_attempts,
+                    "block_for": block_for,
+                    "channel": USER_BLOCK_CHANNEL,
+                },
+            )
+            row = await cur.fetchone()
+            await conn.commit()
+        return bool(row and row[0])
+
+    async def record_successful_login(self, user_id: int) -> None:
+        """Reset the failure counter and clear a past block."""
+        async with connection() as conn, conn.cursor() as cur:
+            await cur.execute(
                 """
                 UPDATE users
-                SET failed_attempts = failed_attempts + 1
+                SET failed_attempts = 0, blocked_until = NULL
                 WHERE user_id = %s
-                RETURNING failed_attempts
+                AND (failed_attempts <> 0 OR blocked_until IS NOT NULL)
                 """,
                 (user_id,),
             )
-            new_count_row = cur.fetchone()
-            conn.commit()
-        return int(new_count_row[0]) if new_count_row else 0
+            await conn.commit()
 
-    def reset_failed_attempts(self, user_id: int) -> None:
-        with _get_conn() as conn, conn.cursor() as cur:
-            cur.execute(
+
+class RefreshTokensRepository:
+    """Refresh tokens, kept until they expire.
+
+    Used and revoked tokens stay until then so that replaying them is
+    detected (see revoke_family); every purge_interval seconds, the next
+    create or rotate first deletes the expired ones.
+    """
+
+    def __init__(self, purge_interval: float = 60.0) -> None:
+        self._purge_interval = purge_interval
+        self._next_purge = time.monotonic() + purge_interval
+
+    async def create(
+        self, user_id: int, family_id: uuid.UUID, token_hash: bytes, expires_at: datetime
+    ) -> None:
+        await self._purge_if_due()
+        async with connection() as conn, conn.cursor() as cur:
+            await cur.execute(
                 """
-                UPDATE users
-                SET failed_attempts = 0
-                WHERE user_id = %s
+                INSERT INTO refresh_tokens
+                (user_id, family_id, token_hash, expires_at)
+                VALUES
+                (%s, %s, %s, %s)
                 """,
-                (user_id,),
+                (user_id, family_id, token_hash, expires_at),
+            )
+            await conn.commit()
+
+    async def rotate(
+        self, token_hash: bytes, new_token_hash: bytes, expires_at: datetime
+    ) -> Optional[tuple[int, str]]:
+        """Swap a live token for a new one of the same family.
+
+        Returns (user_id, email), or None when the token is unknown, expired,
+        already used or its user is blocked; the old token is then untouched.
+        """
+        await self._purge_if_due()
+        async with connection() as conn, conn.cursor() as cur:
+            await cur.execute(
+                """
+                WITH used AS (
+                    UPDATE refresh_tokens r
+                    SET revoked_at = now()
+                    FROM users u
+                    WHERE r.token_hash = %s
+                    AND r.revoked_at IS NULL
+                    AND r.expires_at > now()
+                    AND u.user_id = r.user_id
+                    AND (u.blocked_until IS NULL OR u.blocked_until <= now())
+                    RETURNING r.user_id, r.family_id, u.email
+                ), issued AS (
+                    INSERT INTO refresh_tokens (user_id, family_id, token_hash, expires_at)
+                    SELECT user_id, family_id, %s, %s FROM used
+                )
+                SELECT user_id, email FROM used
+                """,
+                (token_hash, new_token_hash, expires_at),
+            )
+            row = await cur.fetchone()
+            await conn.commit()
+        return (row[0], row[1]) if row else None
+
+    async def revoke_family(self, token_hash: bytes, only_if_used: bool = False) -> bool:
+        """Revoke every live token issued from the same login as this one.
+
+        With only_if_used, do it only when this token was already rotated or
+        revoked, i.e. when it is being replayed. Returns True if it revoked.
+        """
+        async with connection() as conn, conn.cursor() as cur:
+            await cur.execute(
+                """
+                UPDATE refresh_tokens
+                SET revoked_at = now()
+                WHERE family_id = (
+                    SELECT family_id FROM refresh_tokens
+                    WHERE token_hash = %s
+                    AND (NOT %s OR revoked_at IS NOT NULL)
+                )
+                AND revoked_at IS NULL
+                """,
+                (token_hash, only_if_used),
             )
-            conn.commit()
+            revoked = cur.rowcount > 0
+            await conn.commit()
+        return revoked
+
+    async def purge_expired(self) -> int:
+        """Delete every token past its expires_at; returns how many."""
+        async with connection() as conn, conn.cursor() as cur:
+            await cur.execute("DELETE FROM refresh_tokens WHERE expires_at <= now()")
+            purged = cur.rowcount
+            await conn.commit()
+        return purged
+
+    async def _purge_if_due(self) -> None:
+        now = time.monotonic()
+        if now < self._next_purge:
+            return
+        self._next_purge = now + self._purge_interval
+        try:
+            await self.purge_expired()
+        except psycopg.Error:
+            # the tokens are only kept longer; logging in must still work
+            logger.exception("refresh token purge failed")
@@ -0,0 +1,73 @@
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+import psycopg
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import AsyncConnectionPool
+
+from src.infrastructure.settings import get_settings
+
+_pool: AsyncConnectionPool | None = None
+
+
+def conninfo() -> str:
+    settings = get_settings()
+    return make_conninfo(
+        host=settings.db_host,
+        port=settings.db_port,
+        dbname=settings.db_name,
+        user=settings.db_user,
+        password=settings.db_password,
+    )
+
+
+def _create_pool() -> AsyncConnectionPool:
+    settings = get_settings()
+    return AsyncConnectionPool(
+        conninfo(),
+        min_size=settings.db_pool_min_size,
+        max_size=settings.db_pool_max_size,
+        timeout=settings.db_pool_timeout,
+        max_idle=settings.db_pool_max_idle,
+        max_lifetime=settings.db_pool_max_lifetime,
+        name="wishlist",
+        open=False,
+    )
+
+
+async def open_pool(wait: bool = False) -> AsyncConnectionPool:
+    """Create and open the application-wide pool (idempotent).
+
+    Must be called from the event loop that will use the pool.
+    """
+    global _pool
+    if _pool is None:
+        _pool = _create_pool()
+        await _pool.open(wait=wait)
+    return _pool
+
+
+async def close_pool() -> None:
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None:
+        await pool.close()
+
+
+@asynccontextmanager
+async def connection() -> AsyncIterator[psycopg.AsyncConnection[Any]]:
+    """Borrow a connection from the shared pool.
+
+    The connection is returned to the pool on exit: the transaction is
+    committed if the block succeeded and rolled back otherwise.
+    """
+    pool = _pool if _pool is not None else await open_pool()
+    async with pool.connection() as conn:
+        yield conn
+
+
+def pool_stats() -> dict[str, int]:
+    """Pool counters (size, available, waiting, requests, errors...)."""
+    if _pool is None:
+        return {}
+    return _pool.get_stats()
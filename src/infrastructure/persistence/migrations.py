@@ -0,0 +1,217 @@
+"""Versioned schema migrations.
+
+Applied once per process start by the application lifespan, or manually:
+
+    python -m src.infrastructure.persistence.migrations
+"""
+
+import asyncio
+from typing import Any
+
+import dotenv
+import psycopg
+
+from src.infrastructure.persistence import db
+
+# Arbitrary key for pg_advisory_xact_lock so that concurrently starting
+# workers apply migrations one at a time.
+_LOCK_KEY = 0x57495348
+
+# (version, name, sql). Append only: never edit an applied migration.
+MIGRATIONS: list[tuple[int, str, str]] = [
+    (
+        1,
+        "create users",
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            user_id SERIAL PRIMARY KEY,
+            email TEXT NOT NULL UNIQUE,
+            password_hash TEXT NOT NULL,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            blocked_until TIMESTAMPTZ,
+            failed_attempts INTEGER NOT NULL DEFAULT 0
+        );
+        """,
+    ),
+    (
+        2,
+        "create wish lists and notes",
+        """
+        CREATE TABLE IF NOT EXISTS wish_lists (
+            wish_list_id SERIAL PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            description TEXT NOT NULL,
+            estimate_price NUMERIC NOT NULL,
+            link TEXT
+        );
+        CREATE TABLE IF NOT EXISTS wish_notes (
+            wish_note_id SERIAL PRIMARY KEY,
+            wish_list_id INTEGER NOT NULL REFERENCES wish_lists(wish_list_id) ON DELETE CASCADE,
+            title TEXT NOT NULL,
+            description TEXT NOT NULL,
+            received BOOLEAN NOT NULL
+        );
+        """,
+    ),
+    (
+        3,
+        "index wish lists by owner and notes by wish",
+        """
+        CREATE INDEX IF NOT EXISTS ix_wish_lists_user_id_wish_list_id
+            ON wish_lists (user_id, wish_list_id);
+        CREATE INDEX IF NOT EXISTS ix_wish_lists_user_id_estimate_price
+            ON wish_lists (user_id, estimate_price);
+        CREATE INDEX IF NOT EXISTS ix_wish_notes_wish_list_id
+            ON wish_notes (wish_list_id);
+        """,
+    ),
+    (
+        4,
+        "rate limit buckets",
+        """
+        -- UNLOGGED: not WAL-logged nor replicated, emptied after a crash
+        CREATE UNLOGGED TABLE IF NOT EXISTS rate_limit_buckets (
+            key TEXT PRIMARY KEY,
+            -- GCRA theoretical arrival times (epoch seconds), one per limit
+            tats DOUBLE PRECISION[] NOT NULL,
+            expires_at DOUBLE PRECISION NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS ix_rate_limit_buckets_expires_at
+            ON rate_limit_buckets (expires_at);
+
+        -- Takes up to p_tokens requests of p_key from every limit at once.
+        -- granted = 0 means rejected by limit number `exceeded` (0-based).
+        CREATE OR REPLACE FUNCTION rate_limit_lease(
+            p_key TEXT,
+            p_intervals DOUBLE PRECISION[],
+            p_tolerances DOUBLE PRECISION[],
+            p_tokens INTEGER
+        ) RETURNS TABLE (granted INTEGER, exceeded INTEGER, retry_after DOUBLE PRECISION)
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            v_now DOUBLE PRECISION := extract(epoch FROM clock_timestamp());
+            v_tats DOUBLE PRECISION[];
+            v_tat DOUBLE PRECISION;
+            v_fit INTEGER;
+            v_granted INTEGER := p_tokens;
+        BEGIN
+            SELECT b.tats INTO v_tats FROM rate_limit_buckets b WHERE b.key = p_key FOR UPDATE;
+            IF NOT FOUND THEN
+                INSERT INTO rate_limit_buckets (key, tats, expires_at)
+                VALUES (p_key, array_fill(v_now, ARRAY[cardinality(p_intervals)]), v_now)
+                ON CONFLICT (key) DO NOTHING;
+                SELECT b.tats INTO v_tats FROM rate_limit_buckets b
+                WHERE b.key = p_key FOR UPDATE;
+            END IF;
+
+            FOR i IN 1..cardinality(p_intervals) LOOP
+                v_tat := greatest(v_tats[i], v_now);
+                v_fit := floor((v_now + p_tolerances[i] - v_tat) / p_intervals[i] + 1e-9) + 1;
+                IF v_fit < 1 THEN
+                    RETURN QUERY SELECT 0, i - 1, v_tat - p_tolerances[i] - v_now;
+                    RETURN;
+                END IF;
+                v_granted := least(v_granted, v_fit);
+            END LOOP;
+
+            FOR i IN 1..cardinality(p_intervals) LOOP
+                v_tats[i] := greatest(v_tats[i], v_now) + v_granted * p_intervals[i];
+            END LOOP;
+            UPDATE rate_limit_buckets b
+            SET tats = v_tats, expires_at = (SELECT max(t) FROM unnest(v_tats) t)
+            WHERE b.key = p_key;
+            RETURN QUERY SELECT v_granted, NULL::INTEGER, 0::DOUBLE PRECISION;
+        END;
+        $$;
+        """,
+    ),
+    (
+        5,
+        "refresh tokens",
+        """
+        CREATE TABLE IF NOT EXISTS refresh_tokens (
+            token_id BIGSERIAL PRIMARY KEY,
+            user_id INTEGER NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+            -- every token rotated from the same login shares the family
+            family_id UUID NOT NULL,
+            -- sha256 of the token, the token itself is never stored
+            token_hash BYTEA NOT NULL,
+            expires_at TIMESTAMPTZ NOT NULL,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            revoked_at TIMESTAMPTZ
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_refresh_tokens_token_hash
+            ON refresh_tokens (token_hash);
+        CREATE INDEX IF NOT EXISTS ix_refresh_tokens_family_id
+            ON refresh_tokens (family_id);
+        """,
+    ),
+    (
+        6,
+        "wish list versions",
+        """
+        -- bumped by every write to the wish or its notes; served as the ETag.
+        -- A constant default does not rewrite the table.
+        ALTER TABLE wish_lists ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 1;
+        """,
+    ),
+    (
+        7,
+        "refresh token expiry index",
+        """
+        -- RefreshTokensRepository.purge_expired deletes by expiry
+        CREATE INDEX IF NOT EXISTS ix_refresh_tokens_expires_at
+            ON refresh_tokens (expires_at);
+        """,
+    ),
+]
+
+
+async def migrate(conn: psycopg.AsyncConnection[Any]) -> list[int]:
+    """Apply pending migrations in a single transaction.
+
+    Returns the versions that were applied by this call.
+    """
+    applied_now: list[int] = []
+    async with conn.transaction():
+        await conn.execute("SELECT pg_advisory_xact_lock(%s)", (_LOCK_KEY,))
+        await conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            );
+            """
+        )
+        cur = await conn.execute("SELECT version FROM schema_migrations")
+        applied = {row[0] for row in await cur.fetchall()}
+        for version, name, sql in MIGRATIONS:
+            if version in applied:
+                continue
+            await conn.execute(sql)
+            await conn.execute(
+                "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                (version, name),
+            )
+            applied_now.append(version)
+    return applied_now
+
+
+async def run_migrations() -> list[int]:
+    async with db.connection() as conn:
+        return await migrate(conn)
+
+
+async def _main() -> list[int]:
+    try:
+        return await run_migrations()
+    finally:
+        await db.close_pool()
+
+
+if __name__ == "__main__":
+    dotenv.load_dotenv()
+    versions = asyncio.run(_main())
+    print(f"applied migrations: {versions}" if versions else "schema is up to date")
@@ -0,0 +1,76 @@
+"""PostgreSQL LISTEN/NOTIFY subscriber used to invalidate in-process caches."""
+
+import asyncio
+import logging
+from typing import Callable
+
+import psycopg
+
+from src.infrastructure.persistence.db import conninfo
+
+logger = logging.getLogger(__name__)
+
+# payload: user_id whose blocked_until changed
+USER_BLOCK_CHANNEL = "user_block_changed"
+# payload: "wish_id:user_id", either may be empty (see WishListStorage)
+WISH_LIST_CHANNEL = "wish_list_changed"
+
+
+class NotificationListener:
+    """Calls `on_notify(payload)` for each notification on `channel`.
+
+    Listens on its own connection, outside the pool. Notifications sent
+    while it is disconnected are lost, so `on_reset` is called on every
+    (re)connect for the subscriber to drop whatever it cached.
+    """
+
+    def __init__(
+        self,
+        channel: str,
+        on_notify: Callable[[str], None],
+        on_reset: Callable[[], None],
+        reconnect_delay: float = 1.0,
+    ) -> None:
+        self._channel = channel
+        self._on_notify = on_notify
+        self._on_reset = on_reset
+        self._reconnect_delay = reconnect_delay
+        self._task: asyncio.Task | None = None
+        self._listening = asyncio.Event()
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=f"listen:{self._channel}")
+
+    async def wait_listening(self) -> None:
+        await self._listening.wait()
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(
+                    conninfo(), autocommit=True
+                ) as conn:
+                    # the channel is a constant identifier, not user input
+                    await conn.execute(f"LISTEN {self._channel}")
+                    self._on_reset()
+                    self._listening.set()
+                    async for notify in conn.notifies():
+                        self._on_notify(notify.payload)
+            except psycopg.OperationalError:
+                self._listening.clear()
+                logger.warning(
+                    "lost LISTEN %s connection, retrying in %s s",
+                    self._channel,
+                    self._reconnect_delay,
+                )
+                await asyncio.sleep(self._reconnect_delay)
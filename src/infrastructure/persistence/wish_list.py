@@ -1,55 +1,34 @@
-import os
 from decimal import Decimal
 from typing import Any
 
-import psycopg
+from psycopg.rows import args_row
 
 from src.domain.entities import WishList, WishNote
-from src.domain.models import WishListCreate, WishListUpdate, WishNoteCreate, WishNoteUpdate
+from src.domain.models import (
+    VersionedWishList,
+    WishListCreate,
+    WishListDetailed,
+    WishListUpdate,
+    WishNoteCreate,
+    WishNoteUpdate,
+)
+from src.infrastructure.persistence.db import connection
+from src.infrastructure.persistence.notifications import WISH_LIST_CHANNEL
 
 
-def _get_conn() -> psycopg.Connection[Any]:
-    host = os.getenv("DB_HOST", "localhost")
-    port = int(os.getenv("DB_PORT", "5432"))
-    dbname = os.getenv("DB_NAME", "wishlist")
-    user = os.getenv("DB_USER", "wishlist")
-    password = os.getenv("DB_PASSWORD", "wishlist")
-    return psycopg.connect(host=host, port=port, dbname=dbname, user=user, password=password)
-
-
-def _ensure_schema() -> None:
-    with _get_conn() as conn, conn.cursor() as cur:
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS wish_lists (
-                wish_list_id SERIAL PRIMARY KEY,
-                user_id INTEGER NOT NULL,
-                title TEXT NOT NULL,
-                description TEXT NOT NULL,
-                estimate_price NUMERIC NOT NULL,
-                link TEXT
-            );
-            """
-        )
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS wish_notes (
-                wish_note_id SERIAL PRIMARY KEY,
-                wish_list_id INTEGER NOT NULL REFERENCES wish_lists(wish_list_id) ON DELETE CASCADE,
-                title TEXT NOT NULL,
-                description TEXT NOT NULL,
-                received BOOLEAN NOT NULL
-            );
-            """
-        )
-        conn.commit()
+def _notes_columns(
+    notes: list[WishNoteCreate] | list[WishNoteUpdate],
+) -> tuple[list[str], list[str], list[bool]]:
+    """Split notes into per-column arrays for a single unnest()-based INSERT."""
+    return (
+        [note.title for note in notes],
+        [note.description for note in notes],
+        [note.received for note in notes],
+    )
 
 
 class WishListStorage:
-    def __init__(self) -> None:
-        _ensure_schema()
-
-    def get_all(self, maxPrice: Decimal | None = None) -> list[WishList]:
+    async def get_all(self, maxPrice: Decimal | None = None) -> list[WishList]:
         query = """
             SELECT
             wish_list_id, user_id, title, description, estimate_price, link
@@ -60,22 +39,21 @@ class WishListStorage:
             query += " WHERE estimate_price <= %s"
             params = (maxPrice,)
         query += " ORDER BY wish_list_id"
-        with _get_conn() as conn, conn.cursor() as cur:
-            cur.execute(query, params)
-            rows = cur.fetchall()
-        result: list[WishList] = []
-        for r in rows:
-            item = WishList()
-            item.wish_list_id = r[0]
-            item.user_id = r[1]
-            item.title = r[2]
-            item.description = r[3]
-            item.estimate_price = r[4]
-            item.link = r[5]
-            result.append(item)
-        return result
-
-    def get_all_by_user_id(self, user_id: int, maxPrice: Decimal | None = None) -> list[WishList]:
+        async with connection() as conn, conn.cursor(row_factory=args_row(WishList)) as cur:
+            await cur.execute(query, params)
+            return await cur.fetchall()
+
+    async def get_all_by_user_id(
+        self,
+        user_id: int,
+        maxPrice: Decimal | None = None,
+        after_id: int | None = None,
+        limit: int | None = None,
+    ) -> list[WishList]:
+        """User's wish lists ordered by id, optionally as a keyset page.
+
+        after_id is the last id of the previous page (exclusive).
+        """
         query = """
             SELECT
             wish_list_id, user_id, title, description, estimate_price, link
@@ -85,26 +63,21 @@ class WishListStorage:
         params: tuple[Any, ...] = (user_id,)
         if maxPrice is not None:
             query += " AND estimate_price <= %s"
-            params = (user_id, maxPrice)
+            params += (maxPrice,)
+        if after_id is not None:
+            query += " AND wish_list_id > %s"
+            params += (after_id,)
         query += " ORDER BY wish_list_id"
-        with _get_conn() as conn, conn.cursor() as cur:
-            cur.execute(query, params)
-            rows = cur.fetchall()
-        result: list[WishList] = []
-        for r in rows:
-            item = WishList()
-            item.wish_list_id = r[0]
-            item.user_id = r[1]
-            item.title = r[2]
-            item.description = r[3]
-            item.estimate_price = r[4]
-            item.link = r[5]
-            result.append(item)
-        return result
-
-    def get_by_id(self, wish_id: int) -> WishList | None:
-        with _get_conn() as conn, conn.cursor() as cur:
-            cur.execute(
+        if limit is not None:
+            query += " LIMIT %s"
+            params += (limit,)
+        async with connection() as conn, conn.cursor(row_factory=args_row(WishList)) as cur:
+            await cur.execute(query, params)
+            return await cur.fetchall()
+
+    async def get_by_id(self, wish_id: int) -> WishList | None:
+        async with connection() as conn, conn.cursor(row_factory=args_row(WishList)) as cur:
+            await cur.execute(
                 """
                 SELECT
                 wish_list_id, user_id, title, description, estimate_price, link
@@ -113,21 +86,59 @@ class WishListStorage:
                 """,
                 (wish_id,),
             )
-            row = cur.fetchone()
+            return await cur.fetchone()
+
+    async def get_detailed(self, wish_id: int, user_id: int) -> WishListDetailed | None:
+        """Wish list with its notes in one round trip.
+
+        Returns None both when the wish does not exist and when it belongs
+        to another user.
+        """
+        versioned = await self.get_versioned(wish_id, user_id)
+        return None if versioned is None else versioned.wish
+
+    async def get_versioned(
+        self, wish_id: int, user_id: int, known_versions: list[int] | None = None
+    ) -> VersionedWishList | None:
+        """Like get_detailed, plus the version; notes are not read at all
+        when the version is one of known_versions (an If-None-Match hit).
+        """
+        async with connection() as conn, conn.cursor() as cur:
+            await cur.execute(
+                """
+                SELECT
+                w.version,
+                w.wish_list_id, w.user_id, w.title, w.description, w.estimate_price, w.link,
+                CASE WHEN w.version = ANY(%s::bigint[]) THEN NULL ELSE COALESCE(
+                    (
+                        SELECT json_agg(
+                            json_build_array(
+                                n.wish_note_id, n.wish_list_id, n.title, n.description, n.received
+                            )
+                            ORDER BY n.wish_note_id
+                        )
+                        FROM wish_notes n
+                        WHERE n.wish_list_id = w.wish_list_id
+                    ),
+                    '[]'::json
+                ) END
+                FROM wish_lists w
+                WHERE w.wish_list_id = %s AND w.user_id = %s
+                """,
+                (known_versions or [], wish_id, user_id),
+            )
+            row = await cur.fetchone()
         if row is None:
             return None
-        item = WishList()
-        item.wish_list_id = row[0]
-        item.user_id = row[1]
-        item.title = row[2]
-        item.description = row[3]
-        item.estimate_price = row[4]
-        item.link = row[5]
-        return item
-
-    def create(self, wish: WishListCreate) -> int:
-        with _get_conn() as conn, conn.cursor() as cur:
-            cur.execute(
+        if row[7] is None:
+            return VersionedWishList(row[0], None)
+        return VersionedWishList(
+            row[0], WishListDetailed(*row[1:7], [WishNote(*note) for note in row[7]])
+        )
+
+    async def create(self, wish: WishListCreate) -> int:
+        async with connection() as conn, conn.cursor() as cur:
+            await cur.execute(
                 """
                 INSERT INTO wish_lists
                 (user_id, title, description, estimate_price, link)
@@ -137,64 +148,138 @@ class WishListStorage:
                 """,
                 (wish.user_id, wish.title, wish.description, wish.estimate_price, None),
             )
-            new_id = cur.fetchone()[0]
-            conn.commit()
+            new_id = (await cur.fetchone())[0]
+            await conn.commit()
             return int(new_id)
 
-    def update(self, wish_id: int, wish: WishListUpdate) -> bool:
-        with _get_conn() as conn, conn.cursor() as cur:
-            cur.execute(
+    async def create_with_notes(self, wish: WishListCreate, notes: list[WishNoteCreate]) -> int:
+        """Insert the wish list and all of its notes in one statement.
+
+        Notifies WISH_LIST_CHANNEL with ":user_id" (delivered on commit).
+        """
+        async with connection() as conn, conn.cursor() as cur:
+            await cur.execute(
                 """
-                UPDATE wish_lists
-                SET
-                title = %s,
-                description = %s,
-                estimate_price = %s,
-                link = %s
-                WHERE wish_list_id = %s
+                WITH new_wish AS (
+                    INSERT INTO wish_lists
+                    (user_id, title, description, estimate_price, link)
+                    VALUES
+                    (%s, %s, %s, %s, %s)
+                    RETURNING wish_list_id, user_id
+                ), new_notes AS (
+                    INSERT INTO wish_notes
+                    (wish_list_id, title, description, received)
+                    SELECT new_wish.wish_list_id, n.title, n.description, n.received
+                    FROM new_wish,
+                    unnest(%s::text[], %s::text[], %s::boolean[])
+                    WITH ORDINALITY AS n(title, description, received, ord)
+                    ORDER BY n.ord
+                )
+                SELECT wish_list_id, pg_notify(%s, ':' || user_id) FROM new_wish
                 """,
-                (wish.title, wish.description, wish.estimate_price, wish.link, wish_id),
+                (
+                    wish.user_id,
+                    wish.title,
+                    wish.description,
+                    wish.estimate_price,
+                    None,
+                    *_notes_columns(notes),
+                    WISH_LIST_CHANNEL,
+                ),
             )
-            updated = cur.rowcount > 0
-            conn.commit()
-            return updated
-
-    def delete(self, wish_id: int) -> bool:
-        with _get_conn() as conn, conn.cursor() as cur:
-            cur.execute("DELETE FROM wish_lists WHERE wish_list_id = %s", (wish_id,))
-            deleted = cur.rowcount > 0
-            conn.commit()
+            new_id = (await cur.fetchone())[0]
+            await conn.commit()
+            return int(new_id)
+
+    async def update(
+        self,
+        wish_id: int,
+        user_id: int,
+        wish: WishListUpdate,
+        expected_versions: list[int] | None = None,
+    ) -> int | None:
+        """Update the wish if it belongs to user_id and, when expected_versions
+        is given, is still at one of them.
+
+        Returns the new version; None when nothing matched. Notifies
+        WISH_LIST_CHANNEL with "wish_id:user_id" when it updated the wish.
+        """
+        async with connection() as conn, conn.cursor() as cur:
+            await cur.execute(
+                """
+                WITH w AS (
+                    UPDATE wish_lists
+                    SET
+                    title = %s,
+                    description = %s,
+                    estimate_price = %s,
+                    link = %s,
+                    version = version + 1
+                    WHERE wish_list_id = %s AND user_id = %s
+                    AND (%s::bigint[] IS NULL OR version = ANY(%s::bigint[]))
+                    RETURNING wish_list_id, user_id, version
+                )
+                SELECT version, pg_notify(%s, wish_list_id || ':' || user_id) FROM w
+                """,
+                (
+                    wish.title,
+                    wish.description,
+                    wish.estimate_price,
+                    wish.link,
+                    wish_id,
+                    user_id,
+                    expected_versions,
+                    expected_versions,
+                    WISH_LIST_CHANNEL,
+                ),
+            )
+            row = await cur.fetchone()
+            await conn.commit()
+        return None if row is None else int(row[0])
+
+    async def delete(self, wish_id: int, user_id: int) -> bool:
+        """Delete the wish if it belongs to user_id; False when nothing matched.
+
+        Notifies WISH_LIST_CHANNEL with "wish_id:user_id" when it deleted the wish.
+        """
+        async with connection() as conn, conn.cursor() as cur:
+            await cur.execute(
+                """
+                WITH d AS (
+                    DELETE FROM wish_lists
+                    WHERE wish_list_id = %s AND user_id = %s
+                    RETURNING wish_list_id, user_id
+                )
+                SELECT pg_notify(%s, wish_list_id || ':' || user_id) FROM d
+                """,
+                (wish_id, user_id, WISH_LIST_CHANNEL),
+            )
+            deleted = await cur.fetchone() is not None
+            await conn.commit()
             return deleted
 
 
 class WishNotesStorage:
-    def __init__(self) -> None:
-        _ensure_schema()
+    # Every notes write starts with the CTE `w`: it bumps the version of the
+    # wish (owner and If-Match checked) and locks its row, so concurrent
+    # writers to the same wish queue up and the loser sees the new version.
+    # The write joins `w`, so it touches nothing when `w` matched no row, and
+    # the wish is announced on WISH_LIST_CHANNEL ("wish_id:") when it did.
 
-    def get_all(self) -> list[WishNote]:
-        with _get_conn() as conn, conn.cursor() as cur:
-            cur.execute(
+    async def get_all(self) -> list[WishNote]:
+        async with connection() as conn, conn.cursor(row_factory=args_row(WishNote)) as cur:
+            await cur.execute(
                 """
                 SELECT
                 wish_note_id, wish_list_id, title, description, received
                 FROM wish_notes
                 """
             )
-            rows = cur.fetchall()
-        result: list[WishNote] = []
-        for r in rows:
-            item = WishNote()
-            item.wish_note_id = r[0]
-            item.wish_list_id = r[1]
-            item.title = r[2]
-            item.description = r[3]
-            item.received = r[4]
-            result.append(item)
-        return result
-
-    def get_all_by_wish_id(self, wish_id: int) -> list[WishNote]:
-        with _get_conn() as conn, conn.cursor() as cur:
-            cur.execute(
+            return await cur.fetchall()
+
+    async def get_all_by_wish_id(self, wish_id: int) -> list[WishNote]:
+        async with connection() as conn, conn.cursor(row_factory=args_row(WishNote)) as cur:
+            await cur.execute(
                 """
                 SELECT
                 wish_note_id, wish_list_id, title, description, received
@@ -203,21 +288,11 @@ class WishNotesStorage:
                 """,
                 (wish_id,),
             )
-            rows = cur.fetchall()
-        result: list[WishNote] = []
-        for r in rows:
-            item = WishNote()
-            item.wish_note_id = r[0]
-            item.wish_list_id = r[1]
-            item.title = r[2]
-            item.description = r[3]
-            item.received = r[4]
-            result.append(item)
-        return result
-
-    def get_by_id(self, note_id: int) -> WishNote | None:
-        with _get_conn() as conn, conn.cursor() as cur:
-            cur.execute(
+            return await cur.fetchall()
+
+    async def get_by_id(self, note_id: int) -> WishNote | None:
+        async with connection() as conn, conn.cursor(row_factory=args_row(WishNote)) as cur:
+            await cur.execute(
                 """
                 SELECT
                 wish_note_id, wish_list_id, title, description, received
@@ -226,20 +301,11 @@ class WishNotesStorage:
                 """,
                 (note_id,),
             )
-            row = cur.fetchone()
-        if row is None:
-            return None
-        item = WishNote()
-        item.wish_note_id = row[0]
-        item.wish_list_id = row[1]
-        item.title = row[2]
-        item.description = row[3]
-        item.received = row[4]
-        return item
-
-    def create(self, wish_id: int, note: WishNoteCreate) -> int:
-        with _get_conn() as conn, conn.cursor() as cur:
-            cur.execute(
+            return await cur.fetchone()
+
+    async def create(self, wish_id: int, note: WishNoteCreate) -> int:
+        async with connection() as conn, conn.cursor() as cur:
+            await cur.execute(
                 """
                 INSERT INTO wish_notes
                 (wish_list_id, title, description, received)
@@ -249,36 +315,160 @@ class WishNotesStorage:
                 """,
                 (wish_id, note.title, note.description, note.received),
             )
-            new_id = cur.fetchone()[0]
-            conn.commit()
+            new_id = (await cur.fetchone())[0]
+            await conn.commit()
             return int(new_id)
 
-    def update(self, note: WishNoteUpdate) -> bool:
-        with _get_conn() as conn, conn.cursor() as cur:
-            cur.execute(
+    async def create_many(
+        self,
+        wish_id: int,
+        user_id: int,
+        notes: list[WishNoteCreate],
+        expected_versions: list[int] | None = None,
+    ) -> tuple[int | None, list[int]]:
+        """Insert all notes in one statement if the wish belongs to user_id.
+
+        Returns the wish's new version and the new ids in input order; the
+        version is None (and nothing is inserted) when the wish did not match.
+        """
+        async with connection() as conn, conn.cursor() as cur:
+            await cur.execute(
                 """
-                UPDATE wish_notes
-                SET
-                title = %s,
-                description = %s,
-                received = %s
-                WHERE wish_note_id = %s
+                WITH w AS (
+                    UPDATE wish_lists
+                    SET version = version + 1
+                    WHERE wish_list_id = %s AND user_id = %s
+                    AND (%s::bigint[] IS NULL OR version = ANY(%s::bigint[]))
+                    RETURNING wish_list_id, version
+                ), n AS (
+                    INSERT INTO wish_notes
+                    (wish_list_id, title, description, received)
+                    SELECT w.wish_list_id, n.title, n.description, n.received
+                    FROM w,
+                    unnest(%s::text[], %s::text[], %s::boolean[])
+                    WITH ORDINALITY AS n(title, description, received, ord)
+                    ORDER BY n.ord
+                    RETURNING wish_note_id
+                )
+                SELECT
+                (SELECT version FROM w),
+                ARRAY(SELECT wish_note_id FROM n),
+                (SELECT pg_notify(%s, wish_list_id || ':') FROM w)
                 """,
-                (note.title, note.description, note.received, note.wish_note_id),
+                (
+                    wish_id,
+                    user_id,
+                    expected_versions,
+                    expected_versions,
+                    *_notes_columns(notes),
+                    WISH_LIST_CHANNEL,
+                ),
             )
-            updated = cur.rowcount > 0
-            conn.commit()
-            return updated
-
-    def delete(self, note_id: int) -> bool:
-        with _get_conn() as conn, conn.cursor() as cur:
-            cur.execute("DELETE FROM wish_notes WHERE wish_note_id = %s", (note_id,))
-            deleted = cur.rowcount > 0
-            conn.commit()
-            return deleted
+            version, ids, _ = await cur.fetchone()
+            await conn.commit()
+        return version, sorted(ids)
+
+    async def update_many(
+        self,
+        wish_id: int,
+        user_id: int,
+        notes: list[WishNoteUpdate],
+        expected_versions: list[int] | None = None,
+    ) -> tuple[int | None, set[int]]:
+        """Update notes of a wish owned by user_id in one statement.
+
+        Returns the wish's new version (None when the wish did not match) and
+        the ids that were updated; notes of other wishes are ignored.
+        """
+        async with connection() as conn, conn.cursor() as cur:
+            await cur.execute(
+                """
+                WITH w AS (
+                    UPDATE wish_lists
+                    SET version = version + 1
+                    WHERE wish_list_id = %s AND user_id = %s
+                    AND (%s::bigint[] IS NULL OR version = ANY(%s::bigint[]))
+                    RETURNING wish_list_id, version
+                ), n AS (
+                    UPDATE wish_notes n
+                    SET
+                    title = v.title,
+                    description = v.description,
+                    received = v.received
+                    FROM w,
+                    unnest(%s::integer[], %s::text[], %s::text[], %s::boolean[])
+                    AS v(wish_note_id, title, description, received)
+                    WHERE n.wish_note_id = v.wish_note_id
+                    AND n.wish_list_id = w.wish_list_id
+                    RETURNING n.wish_note_id
+                )
+                SELECT
+                (SELECT version FROM w),
+                ARRAY(SELECT wish_note_id FROM n),
+                (SELECT pg_notify(%s, wish_list_id || ':') FROM w)
+                """,
+                (
+                    wish_id,
+                    user_id,
+                    expected_versions,
+                    expected_versions,
+                    [note.wish_note_id for note in notes],
+                    *_notes_columns(notes),
+                    WISH_LIST_CHANNEL,
+                ),
+            )
+            version, ids, _ = await cur.fetchone()
+            await conn.commit()
+        return version, set(ids)
+
+    async def delete_many(
+        self,
+        wish_id: int,
+        user_id: int,
+        note_ids: list[int],
+        expected_versions: list[int] | None = None,
+    ) -> tuple[int | None, set[int]]:
+        """Delete notes of a wish owned by user_id in one statement.
+
+        Returns the wish's new version (None when the wish did not match) and
+        the ids that were deleted; notes of other wishes are ignored.
+        """
+        async with connection() as conn, conn.cursor() as cur:
+            await cur.execute(
+                """
+                WITH w AS (
+                    UPDATE wish_lists
+                    SET version = version + 1
+                    WHERE wish_list_id = %s AND user_id = %s
+                    AND (%s::bigint[] IS NULL OR version = ANY(%s::bigint[]))
+                    RETURNING wish_list_id, version
+                ), n AS (
+                    DELETE FROM wish_notes n
+                    USING w
+                    WHERE n.wish_note_id = ANY(%s::integer[])
+                    AND n.wish_list_id = w.wish_list_id
+                    RETURNING n.wish_note_id
+                )
+                SELECT
+                (SELECT version FROM w),
+                ARRAY(SELECT wish_note_id FROM n),
+                (SELECT pg_notify(%s, wish_list_id || ':') FROM w)
+                """,
+                (
+                    wish_id,
+                    user_id,
+                    expected_versions,
+                    expected_versions,
+                    note_ids,
+                    WISH_LIST_CHANNEL,
+                ),
+            )
+            version, ids, _ = await cur.fetchone()
+            await conn.commit()
+        return version, set(ids)
 
-    def delete_by_wish_id(self, wish_id: int) -> bool:
-        with _get_conn() as conn, conn.cursor() as cur:
-            cur.execute("DELETE FROM wish_notes WHERE wish_list_id = %s", (wish_id,))
-            conn.commit()
+    async def delete_by_wish_id(self, wish_id: int) -> bool:
+        async with connection() as conn, conn.cursor() as cur:
+            await cur.execute("DELETE FROM wish_notes WHERE wish_list_id = %s", (wish_id,))
+            await conn.commit()
             return True
@@ -0,0 +1,68 @@
+import math
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Sequence
+
+# absorbs float rounding so that exactly `count` back-to-back requests fit
+_EPSILON = 1e-9
+
+
+@dataclass(frozen=True, slots=True)
+class Limit:
+    """At most `count` requests per `period` seconds."""
+
+    count: int
+    period: float
+
+    @property
+    def interval(self) -> float:
+        # GCRA emission interval: spacing between requests at the steady rate
+        return self.period / self.count
+
+    @property
+    def tolerance(self) -> float:
+        # how far the theoretical arrival time may run ahead of now, i.e. burst size
+        return self.period - self.interval
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitDecision:
+    allowed: bool
+    # name of the limit that rejected the request ("rate" or "burst")
+    exceeded: str | None = None
+    # seconds until the request would have been allowed
+    retry_after: float = 0.0
+
+
+ALLOWED = RateLimitDecision(True)
+
+
+def gcra(
+    limits: Sequence[tuple[str, Limit]], tats: Sequence[float], now: float, tokens: int = 1
+) -> tuple[int, list[float], RateLimitDecision]:
+    """Take up to `tokens` requests from every limit at once.
+
+    `tats` are the theoretical arrival times of the key, one per limit.
+    Returns how many requests were granted, the new TATs and the decision;
+    nothing is taken when the first request already does not fit.
+    """
+    granted = tokens
+    for (name, limit), tat in zip(limits, tats):
+        tat = max(tat, now)
+        fit = math.floor((now + limit.tolerance - tat) / limit.interval + _EPSILON) + 1
+        if fit < 1:
+            return 0, list(tats), RateLimitDecision(False, name, tat - limit.tolerance - now)
+        granted = min(granted, fit)
+    new_tats = [max(tat, now) + granted * limit.interval for (_, limit), tat in zip(limits, tats)]
+    return granted, new_tats, ALLOWED
+
+
+class RateLimiter(ABC):
+    """Storage of per-key rate-limit state."""
+
+    @abstractmethod
+    async def acquire(self, key: str) -> RateLimitDecision:
+        """Count one request for `key` if every limit allows it."""
+
+    async def close(self) -> None:
+        pass
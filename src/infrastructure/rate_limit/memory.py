@@ -0,0 +1,62 @@
+"""In-process GCRA rate limiter.
+
+Each key keeps one theoretical arrival time (TAT) per limit, so checking
+both the sustained and the burst limit is O(1) whatever the limits are.
+A key whose TATs are all in the past is indistinguishable from a new key
+and is dropped once it is the least recently used one; the number of
+tracked keys is also capped.
+
+State is per process: every uvicorn worker counts on its own.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from src.infrastructure.rate_limit.base import Limit, RateLimitDecision, RateLimiter, gcra
+
+
+class InMemoryRateLimiter(RateLimiter):
+    def __init__(
+        self,
+        limits: dict[str, Limit],
+        max_keys: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._limits = list(limits.items())
+        self._max_keys = max_keys
+        self._clock = clock
+        # key -> TAT per limit, least recently used first
+        self._state: OrderedDict[str, list[float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+    async def acquire(self, key: str) -> RateLimitDecision:
+        return self.try_acquire(key)
+
+    def try_acquire(self, key: str) -> RateLimitDecision:
+        now = self._clock()
+        self._evict_idle(now)
+
+        tats = self._state.get(key)
+        if tats is None:
+            tats = [now] * len(self._limits)
+        else:
+            self._state.move_to_end(key)
+
+        granted, new_tats, decision = gcra(self._limits, tats, now)
+        if granted:
+            self._state[key] = new_tats
+            if len(self._state) > self._max_keys:
+                self._state.popitem(last=False)
+        return decision
+
+    def _evict_idle(self, now: float) -> None:
+        # least recently used keys come first, so stop at the first live one
+        state = self._state
+        while state:
+            key, tats = next(iter(state.items()))
+            if max(tats) > now:
+                break
+            del state[key]
@@ -0,0 +1,120 @@
+"""GCRA rate limiter shared by every node through PostgreSQL.
+
+Buckets live in the UNLOGGED table rate_limit_buckets and are updated by
+the rate_limit_lease() function (see migrations), which uses the database
+clock so that all nodes agree on time.
+
+To keep the round trip off most requests, a process leases several
+requests of a key at once and serves them locally. A lease starts at one
+request, doubles each time it is used up before it expires and falls back
+to one otherwise. A client that goes idle right after a lease strands up
+to max_lease - 1 requests in each process until its bucket refills, so
+max_lease is capped to keep that, over all `processes`, within a quarter
+of the smallest limit. Rejections are cached locally until their retry_after.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import psycopg
+
+from src.infrastructure.persistence.db import connection
+from src.infrastructure.rate_limit.base import ALLOWED, Limit, RateLimitDecision, RateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class _Lease:
+    size: int = 0
+    tokens: int = 0
+    expires_at: float = 0.0
+    blocked_until: float = 0.0
+    exceeded: str | None = None
+
+
+class PostgresRateLimiter(RateLimiter):
+    def __init__(
+        self,
+        limits: dict[str, Limit],
+        max_lease: int = 16,
+        lease_ttl: float = 1.0,
+        max_keys: int = 100_000,
+        purge_interval: float = 60.0,
+        processes: int = 1,
+    ) -> None:
+        self._names = list(limits)
+        self._intervals = [limit.interval for limit in limits.values()]
+        self._tolerances = [limit.tolerance for limit in limits.values()]
+        smallest = min(limit.count for limit in limits.values())
+        self._max_lease = max(1, min(max_lease, 1 + smallest // (4 * processes)))
+        self._lease_ttl = lease_ttl
+        self._max_keys = max_keys
+        self._purge_interval = purge_interval
+        self._next_purge = time.monotonic() + purge_interval
+        # key -> local lease, least recently used first
+        self._leases: OrderedDict[str, _Lease] = OrderedDict()
+
+    async def acquire(self, key: str) -> RateLimitDecision:
+        now = time.monotonic()
+        lease = self._leases.get(key)
+        if lease is None:
+            lease = self._leases[key] = _Lease()
+            if len(self._leases) > self._max_keys:
+                self._leases.popitem(last=False)
+            size = 1
+        else:
+            self._leases.move_to_end(key)
+            if now < lease.blocked_until:
+                return RateLimitDecision(False, lease.exceeded, lease.blocked_until - now)
+            if lease.tokens and now < lease.expires_at:
+                lease.tokens -= 1
+                return ALLOWED
+            used_up_in_time = lease.tokens == 0 and now < lease.expires_at
+            size = min(lease.size * 2, self._max_lease) if used_up_in_time else 1
+
+        if now >= self._next_purge:
+            self._next_purge = now + self._purge_interval
+            await self._purge()
+
+        try:
+            granted, exceeded, retry_after = await self._lease(key, size)
+        except psycopg.Error:
+            # a broken limiter must not take the API down with it
+            logger.exception("rate limit lease failed, letting the request through")
+            return ALLOWED
+
+        if not granted:
+            lease.tokens = 0
+            lease.blocked_until = now + retry_after
+            lease.exceeded = self._names[exceeded]
+            return RateLimitDecision(False, lease.exceeded, retry_after)
+        lease.size = size
+        lease.tokens = granted - 1
+        lease.expires_at = now + self._lease_ttl
+        return ALLOWED
+
+    async def _lease(self, key: str, tokens: int) -> tuple[int, int | None, float]:
+        async with connection() as conn, conn.cursor() as cur:
+            await cur.execute(
+                "SELECT granted, exceeded, retry_after FROM rate_limit_lease(%s, %s, %s, %s)",
+                (key, self._intervals, self._tolerances, tokens),
+            )
+            row = await cur.fetchone()
+            await conn.commit()
+        return row
+
+    async def _purge(self) -> None:
+        try:
+            async with connection() as conn:
+                await conn.execute(
+                    """
+                    DELETE FROM rate_limit_buckets
+                    WHERE expires_at < extract(epoch FROM clock_timestamp())
+                    """
+                )
+                await conn.commit()
+        except psycopg.Error:
+            logger.exception("rate limit purge failed")
@@ -0,0 +1,92 @@
+"""GCRA rate limiter shared by all worker processes of one host.
+
+State lives in a memory-mapped file laid out as a fixed-size open
+addressing table: each slot holds a 64-bit key hash and one TAT per limit.
+Updates happen under an exclusive flock(2) on the file, which costs a
+couple of system calls and no network round trip, so there is nothing to
+batch. When every probed slot is live, the one that expires first is
+reused: memory stays bounded and the evicted client gets a fresh bucket.
+
+TATs are wall-clock seconds so that the file stays valid across restarts.
+"""
+
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import time
+from typing import Callable
+
+from src.infrastructure.rate_limit.base import Limit, RateLimitDecision, RateLimiter, gcra
+
+_MAGIC = b"WLRLIM01"
+_HEADER = struct.Struct("<8sII")  # magic, number of limits, capacity
+
+
+class SharedMemoryRateLimiter(RateLimiter):
+    def __init__(
+        self,
+        path: str,
+        limits: dict[str, Limit],
+        capacity: int = 65_536,
+        probes: int = 8,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._limits = list(limits.items())
+        self._capacity = capacity
+        self._probes = probes
+        self._clock = clock
+        self._slot = struct.Struct("<Q" + "d" * len(self._limits))
+        size = _HEADER.size + capacity * self._slot.size
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            header = os.pread(self._fd, _HEADER.size, 0)
+            if os.fstat(self._fd).st_size != size or header != _HEADER.pack(
+                _MAGIC, len(self._limits), capacity
+            ):
+                # new file or another layout: start from empty state
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, size)
+                os.pwrite(self._fd, _HEADER.pack(_MAGIC, len(self._limits), capacity), 0)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._map = mmap.mmap(self._fd, size)
+
+    async def acquire(self, key: str) -> RateLimitDecision:
+        return self.try_acquire(key)
+
+    def try_acquire(self, key: str) -> RateLimitDecision:
+        # 0 marks an empty slot
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        key_hash = int.from_bytes(digest, "little") or 1
+        start = key_hash % self._capacity
+
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            now = self._clock()
+            offset, tats = self._find_slot(key_hash, start, now)
+            granted, new_tats, decision = gcra(self._limits, tats, now)
+            if granted:
+                self._slot.pack_into(self._map, offset, key_hash, *new_tats)
+            return decision
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _find_slot(self, key_hash: int, start: int, now: float) -> tuple[int, list[float]]:
+        victim, victim_expiry = 0, float("inf")
+        for probe in range(self._probes):
+            offset = _HEADER.size + (start + probe) % self._capacity * self._slot.size
+            slot_hash, *tats = self._slot.unpack_from(self._map, offset)
+            if slot_hash == key_hash:
+                return offset, tats
+            expiry = max(tats) if slot_hash else float("-inf")
+            if expiry < victim_expiry:
+                victim, victim_expiry = offset, expiry
+        return victim, [now] * len(self._limits)
+
+    async def close(self) -> None:
+        self._map.close()
+        os.close(self._fd)
@@ -0,0 +1,146 @@
+import os
+import tempfile
+from dataclasses import dataclass
+from functools import lru_cache
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_list(name: str, default: tuple[str, ...]) -> tuple[str, ...]:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return tuple(item.strip() for item in value.split(",") if item.strip())
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Process configuration, read from the environment once at startup."""
+
+    # "production" hides internal details in error responses
+    environment: str = "development"
+
+    db_host: str = "localhost"
+    db_port: int = 5432
+    db_name: str = "wishlist"
+    db_user: str = "wishlist"
+    db_password: str = "wishlist"
+
+    db_pool_min_size: int = 2
+    db_pool_max_size: int = 10
+    # seconds a caller waits for a free connection before PoolTimeout
+    db_pool_timeout: float = 30
+    # seconds an idle connection above min_size is kept open
+    db_pool_max_idle: float = 600
+    # seconds after which a connection is recycled
+    db_pool_max_lifetime: float = 3600
+    db_migrate_on_startup: bool = True
+
+    jwt_secret: str = "WishList Jwt Secret"
+    jwt_algo: str = "HS256"
+    jwt_exp_minutes: int = 60
+    # verified access tokens kept in memory, skipping signature checks
+    jwt_cache_size: int = 10_000
+    refresh_token_ttl_days: int = 30
+
+    # check every request against users.blocked_until in AuthMiddleware
+    auth_middleware_enabled: bool = False
+    # block status cached per user; changes are pushed via LISTEN/NOTIFY
+    user_cache_size: int = 10_000
+    user_cache_ttl_seconds: float = 300
+
+    # bcrypt threads and how many more operations may wait for one
+    password_hash_workers: int = min(4, os.cpu_count() or 1)
+    password_hash_queue: int = 64
+
+    # requests per minute and per 10 seconds, per client IP
+    rate_limit_per_minute: int = 100
+    rate_limit_burst: int = 50
+    # memory (per worker) | shm (all workers of a host) | postgres (all nodes)
+    rate_limit_backend: str = "memory"
+    rate_limit_shm_path: str = os.path.join(tempfile.gettempdir(), "wishlist-rate-limit")
+    # postgres: worker processes of all nodes together, bounds the requests leased ahead
+    rate_limit_processes: int = 1
+
+    # wish lists and list pages cached per worker; writes in other workers
+    # invalidate them through LISTEN/NOTIFY
+    wish_cache_enabled: bool = True
+    # rows held per worker: a wish and each of its notes, a page and each of its items
+    wish_cache_size: int = 10_000
+    wish_cache_ttl_seconds: float = 60
+
+    # client hosts that may read /api/metrics (pool, hasher and cache internals)
+    metrics_allowed_hosts: tuple[str, ...] = ("127.0.0.1", "::1")
+
+    # JSON/text responses at least this large are gzip/brotli compressed
+    compression_min_size: int = 1024
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        defaults = cls()
+        return cls(
+            environment=os.getenv("ENVIRONMENT", defaults.environment),
+            db_host=os.getenv("DB_HOST", defaults.db_host),
+            db_port=int(os.getenv("DB_PORT", defaults.db_port)),
+            db_name=os.getenv("DB_NAME", defaults.db_name),
+            db_user=os.getenv("DB_USER", defaults.db_user),
+            db_password=os.getenv("DB_PASSWORD", defaults.db_password),
+            db_pool_min_size=int(os.getenv("DB_POOL_MIN_SIZE", defaults.db_pool_min_size)),
+            db_pool_max_size=int(os.getenv("DB_POOL_MAX_SIZE", defaults.db_pool_max_size)),
+            db_pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", defaults.db_pool_timeout)),
+            db_pool_max_idle=float(os.getenv("DB_POOL_MAX_IDLE", defaults.db_pool_max_idle)),
+            db_pool_max_lifetime=float(
+                os.getenv("DB_POOL_MAX_LIFETIME", defaults.db_pool_max_lifetime)
+            ),
+            db_migrate_on_startup=_env_bool(
+                "DB_MIGRATE_ON_STARTUP", defaults.db_migrate_on_startup
+            ),
+            jwt_secret=os.getenv("JWT_SECRET", defaults.jwt_secret),
+            jwt_algo=os.getenv("JWT_ALGO", defaults.jwt_algo),
+            jwt_exp_minutes=int(os.getenv("JWT_EXP_MINUTES", defaults.jwt_exp_minutes)),
+            jwt_cache_size=int(os.getenv("JWT_CACHE_SIZE", defaults.jwt_cache_size)),
+            refresh_token_ttl_days=int(
+                os.getenv("REFRESH_TOKEN_TTL_DAYS", defaults.refresh_token_ttl_days)
+            ),
+            auth_middleware_enabled=_env_bool(
+                "AUTH_MIDDLEWARE_ENABLED", defaults.auth_middleware_enabled
+            ),
+            user_cache_size=int(os.getenv("USER_CACHE_SIZE", defaults.user_cache_size)),
+            user_cache_ttl_seconds=float(
+                os.getenv("USER_CACHE_TTL_SECONDS", defaults.user_cache_ttl_seconds)
+            ),
+            password_hash_workers=int(
+                os.getenv("PASSWORD_HASH_WORKERS", defaults.password_hash_workers)
+            ),
+            password_hash_queue=int(os.getenv("PASSWORD_HASH_QUEUE", defaults.password_hash_queue)),
+            rate_limit_per_minute=int(
+                os.getenv("RATE_LIMIT_PER_MINUTE", defaults.rate_limit_per_minute)
+            ),
+            rate_limit_burst=int(os.getenv("RATE_LIMIT_BURST", defaults.rate_limit_burst)),
+            rate_limit_backend=os.getenv("RATE_LIMIT_BACKEND", defaults.rate_limit_backend),
+            rate_limit_shm_path=os.getenv("RATE_LIMIT_SHM_PATH", defaults.rate_limit_shm_path),
+            rate_limit_processes=int(
+                os.getenv("RATE_LIMIT_PROCESSES", defaults.rate_limit_processes)
+            ),
+            wish_cache_enabled=_env_bool("WISH_CACHE_ENABLED", defaults.wish_cache_enabled),
+            wish_cache_size=int(os.getenv("WISH_CACHE_SIZE", defaults.wish_cache_size)),
+            wish_cache_ttl_seconds=float(
+                os.getenv("WISH_CACHE_TTL_SECONDS", defaults.wish_cache_ttl_seconds)
+            ),
+            compression_min_size=int(
+                os.getenv("COMPRESSION_MIN_SIZE", defaults.compression_min_size)
+            ),
+            metrics_allowed_hosts=_env_list(
+                "METRICS_ALLOWED_HOSTS", defaults.metrics_allowed_hosts
+            ),
+        )
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    return Settings.from_env()
@@ -0,0 +1,171 @@
+"""Read-through caches for wish list reads, invalidated by WishListService writes."""
+
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Awaitable, Callable, Hashable, Optional
+
+from src.domain.models import VersionedWishList, WishListPage
+from src.infrastructure.cache import TTLCache
+
+WishLoader = Callable[[], Awaitable[Optional[VersionedWishList]]]
+PageLoader = Callable[[], Awaitable[WishListPage]]
+
+
+class WishListCache(ABC):
+    """Cache of detailed wish lists (by id) and list pages (by user and query).
+
+    Cached objects are shared between requests and must not be mutated.
+    """
+
+    @abstractmethod
+    async def get_wish(self, wish_id: int, load: WishLoader) -> Optional[VersionedWishList]:
+        """The cached wish, or load() (stored when it found the wish)."""
+
+    @abstractmethod
+    async def get_page(self, user_id: int, query: Hashable, load: PageLoader) -> WishListPage:
+        """The cached page of user_id for query (filters, cursor, limit), or load()."""
+
+    @abstractmethod
+    async def invalidate(self, wish_id: int | None = None, user_id: int | None = None) -> None:
+        """Drop the wish wish_id and every cached page of user_id in this process."""
+
+    def on_notify(self, payload: str) -> None:
+        """Apply an invalidation announced by a storage write (see WISH_LIST_CHANNEL)."""
+
+    def clear(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {}
+
+
+class NullWishListCache(WishListCache):
+    """Always loads: WISH_CACHE_ENABLED=false."""
+
+    async def get_wish(self, wish_id: int, load: WishLoader) -> Optional[VersionedWishList]:
+        return await load()
+
+    async def get_page(self, user_id: int, query: Hashable, load: PageLoader) -> WishListPage:
+        return await load()
+
+    async def invalidate(self, wish_id: int | None = None, user_id: int | None = None) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {"enabled": False}
+
+
+def _ratio(hits: int, misses: int) -> float:
+    return round(hits / (hits + misses), 4) if hits + misses else 0.0
+
+
+def _weigh(entry) -> int:
+    """Rows held by a cached wish (itself and its notes) or page group."""
+    if isinstance(entry, VersionedWishList):
+        return 1 + len(entry.wish.notes)
+    return sum(1 + len(page.items) for _, page in entry.values())
+
+
+class InMemoryWishListCache(WishListCache):
+    """Per-process LRU cache with a TTL. invalidate() covers this process;
+    the other processes apply the WISH_LIST_CHANNEL notification that the
+    write statement itself sends, in on_notify.
+
+    Wishes and the pages of each user share one budget of max_items rows
+    (a wish and each of its notes, a page and each of its items), so a
+    worker holds at most that many whatever their shape.
+
+    Entries loaded while an invalidation happened are not stored: the load
+    may have read the database before the write committed.
+
+    Not thread-safe: meant to be used from the event loop only.
+    """
+
+    def __init__(
+        self,
+        max_items: int,
+        ttl: float,
+        max_pages_per_user: int = 16,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ttl = ttl
+        self._max_pages_per_user = max_pages_per_user
+        self._clock = clock
+        # ("wish", wish_id) -> VersionedWishList
+        # ("pages", user_id) -> {query: (expires_at, page)}; dropped as a whole on writes
+        self._entries: TTLCache[tuple[str, int], object] = TTLCache(max_items, clock, _weigh)
+        self._wish_hits = self._wish_misses = 0
+        self._page_hits = self._page_misses = 0
+        # bumped by every invalidation, see the class docstring
+        self._epoch = 0
+
+    async def get_wish(self, wish_id: int, load: WishLoader) -> Optional[VersionedWishList]:
+        cached = self._entries.get(("wish", wish_id))
+        if cached is not None:
+            self._wish_hits += 1
+            return cached
+        self._wish_misses += 1
+        epoch = self._epoch
+        loaded = await load()
+        if loaded is not None and loaded.wish is not None and epoch == self._epoch:
+            self._entries.set(("wish", wish_id), loaded, self._ttl)
+        return loaded
+
+    async def get_page(self, user_id: int, query: Hashable, load: PageLoader) -> WishListPage:
+        key = ("pages", user_id)
+        pages = self._entries.get(key)
+        entry = pages.get(query) if pages is not None else None
+        if entry is not None and entry[0] > self._clock():
+            self._page_hits += 1
+            return entry[1]
+        self._page_misses += 1
+        epoch = self._epoch
+        page = await load()
+        if epoch == self._epoch:
+            # rebuilt rather than changed in place: the cache weighs what it is set
+            now = self._clock()
+            pages = OrderedDict(
+                (q, e) for q, e in (self._entries.get(key) or {}).items() if e[0] > now
+            )
+            pages[query] = (now + self._ttl, page)
+            pages.move_to_end(query)
+            if len(pages) > self._max_pages_per_user:
+                pages.popitem(last=False)
+            self._entries.set(key, pages, self._ttl)
+        return page
+
+    async def invalidate(self, wish_id: int | None = None, user_id: int | None = None) -> None:
+        self._drop(wish_id, user_id)
+
+    def on_notify(self, payload: str) -> None:
+        wish_id, _, user_id = payload.partition(":")
+        self._drop(int(wish_id) if wish_id else None, int(user_id) if user_id else None)
+
+    def _drop(self, wish_id: int | None, user_id: int | None) -> None:
+        self._epoch += 1
+        if wish_id is not None:
+            self._entries.invalidate(("wish", wish_id))
+        if user_id is not None:
+            self._entries.invalidate(("pages", user_id))
+
+    def clear(self) -> None:
+        self._epoch += 1
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": True,
+            "entries": len(self._entries),
+            "items": self._entries.weight,
+            "wishes": {
+                "hits": self._wish_hits,
+                "misses": self._wish_misses,
+                "hit_ratio": _ratio(self._wish_hits, self._wish_misses),
+            },
+            "pages": {
+                "hits": self._page_hits,
+                "misses": self._page_misses,
+                "hit_ratio": _ratio(self._page_hits, self._page_misses),
+            },
+        }
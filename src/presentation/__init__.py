@@ -2,13 +2,14 @@ from fastapi import FastAPI, HTTPException
 from fastapi.exceptions import RequestValidationError
 from pydantic import ValidationError
 
-from src.domain.errors import WishNotFoundError
+from src.app.container import get_container
+from src.domain.errors import ServiceOverloadedError, WishNotFoundError, WishVersionMismatchError
 
-from .controllers import auth, health, wish_list
+from .controllers import auth, health, metrics, wish_list
 from .handlers import exceptions
 from .handlers.middleware import RequestSizeLimitMiddleware
-
-# from .middleware.auth import AuthMiddleware
+from .middleware.auth import AuthMiddleware
+from .middleware.compression import CompressionMiddleware, CompressionStats
 from .middleware.security_middleware import (
     RateLimitMiddleware,
     SecurityHeadersMiddleware,
@@ -23,15 +24,27 @@ def add_presentaion(app: FastAPI):
     app.add_exception_handler(RequestValidationError, exceptions.request_validation_error_handler)
     app.add_exception_handler(ValidationError, exceptions.validation_error_handler)
     app.add_exception_handler(WishNotFoundError, exceptions.wish_not_found_handler)
+    app.add_exception_handler(WishVersionMismatchError, exceptions.wish_version_mismatch_handler)
+    app.add_exception_handler(ServiceOverloadedError, exceptions.service_overloaded_handler)
     app.add_exception_handler(HTTPException, exceptions.http_exception_handler)
 
+    # innermost: only responses of the routes themselves are worth compressing
+    app.state.compression_stats = CompressionStats()
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=get_container().settings.compression_min_size,
+        stats=app.state.compression_stats,
+    )
+    # inside the security stack: its 401s are rate limited, logged and get the headers
+    if get_container().settings.auth_middleware_enabled:
+        app.add_middleware(AuthMiddleware)
     app.add_middleware(SecurityLoggingMiddleware)
-    app.add_middleware(RateLimitMiddleware, requests_per_minute=100, burst_limit=50)
+    app.add_middleware(RateLimitMiddleware, limiter=get_container().rate_limiter)
     app.add_middleware(SecurityHeadersMiddleware)
     app.add_middleware(RequestSizeLimitMiddleware, max_body_size=1_048_576)
-    # app.add_middleware(AuthMiddleware)
 
     # Routers
     app.include_router(health.router, prefix="/api")
+    app.include_router(metrics.router, prefix="/api")
     app.include_router(auth.router, prefix="/api/auth")
     app.include_router(wish_list.router, prefix="/api/wishes")
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, status
 
 from src.domain.auth import UserCreate
+from src.presentation.dependencies import get_auth_service
 from src.presentation.models.auth import (
     LoginRequest,
+    RefreshRequest,
     RegisterRequest,
     RegisterResponse,
     TokenResponse,
@@ -13,12 +15,23 @@ router = APIRouter(tags=["auth"])
 
 
 @router.post("/register", response_model=RegisterResponse)
-async def register(data: RegisterRequest, service: AuthService = Depends()):
-    created = service.register(UserCreate(email=data.email, password=data.password))
+async def register(data: RegisterRequest, service: AuthService = Depends(get_auth_service)):
+    created = await service.register(UserCreate(email=data.email, password=data.password))
     return RegisterResponse(user_id=created.user_id, email=created.email)
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(data: LoginRequest, service: AuthService = Depends()):
-    token = service.login(data.email, data.password)
-    return TokenResponse(access_token=token)
+async def login(data: LoginRequest, service: AuthService = Depends(get_auth_service)):
+    tokens = await service.login(data.email, data.password)
+    return TokenResponse(access_token=tokens.access_token, refresh_token=tokens.refresh_token)
+
+
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh(data: RefreshRequest, service: AuthService = Depends(get_auth_service)):
+    tokens = await service.refresh(data.refresh_token)
+    return TokenResponse(access_token=tokens.access_token, refresh_token=tokens.refresh_token)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(data: RefreshRequest, service: AuthService = Depends(get_auth_service)):
+    await service.logout(data.refresh_token)
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, HTTPException, Request, status
+
+from src.app.container import get_container
+from src.infrastructure.persistence.db import pool_stats
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics")
+def metrics(request: Request):
+    container = get_container()
+    client = request.client.host if request.client else None
+    if client not in container.settings.metrics_allowed_hosts:
+        raise HTTPException(status.HTTP_403_FORBIDDEN, "Metrics are not available to this client")
+    return {
+        "db_pool": pool_stats(),
+        "password_hasher": container.password_hasher.stats(),
+        "jwt_cache": container.auth_service.token_cache.stats(),
+        "user_cache": container.auth_service.user_cache.stats(),
+        "wish_cache": container.wish_list_cache.stats(),
+        "compression": request.app.state.compression_stats.stats(),
+    }
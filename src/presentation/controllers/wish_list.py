@@ -1,108 +1,165 @@
 from decimal import Decimal
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, Query, Response
 
 from src.domain.models import WishListCreate
-from src.presentation.dependencies import CurrentUserID, authorize
-from src.presentation.models.wish_list import WishListPost, WishListPut, WishNotePost, WishNotePut
+from src.presentation.dependencies import CurrentUserID, authorize, get_wish_list_service
+from src.presentation.models.wish_list import (
+    NoteResultsResponse,
+    SuccessResponse,
+    WishListCreatedResponse,
+    WishListDetailedResponse,
+    WishListPageResponse,
+    WishListPost,
+    WishListPut,
+    WishNotePost,
+    WishNotePut,
+)
+from src.presentation.responses import FastJSONResponse
 from src.use_cases.wish_list import WishListService
 
 router = APIRouter(tags=["wishes"])
 
 
-# ...?price=20
-@router.get("")
+def _etag(version: int) -> dict[str, str]:
+    # weak: the version names the wish, not the bytes, which compression changes
+    return {"ETag": f'W/"{version}"'}
+
+
+def _versions(header: Optional[str]) -> Optional[list[int]]:
+    """Wish versions named by an If-Match / If-None-Match value.
+
+    None when there is no header or it is "*". Tags are compared by version,
+    weak or not: the ETag is always weak (see _etag).
+    """
+    if header is None or header.strip() == "*":
+        return None
+    versions = []
+    for tag in header.split(","):
+        tag = tag.strip().removeprefix("W/")
+        value = tag[1:-1]
+        if tag[:1] == tag[-1:] == '"' and value.isascii() and value.isdigit() and len(value) < 19:
+            versions.append(int(value))
+    return versions
+
+
+def _per_note_results(version: int, results: dict[int, bool]) -> FastJSONResponse:
+    return FastJSONResponse(
+        {
+            "success": all(results.values()),
+            "results": [{"wish_note_id": id, "success": ok} for id, ok in results.items()],
+        },
+        headers=_etag(version),
+    )
+
+
+# ...?price=20&limit=50&cursor=120
+@router.get("", response_model=WishListPageResponse)
 @authorize
 async def get_wishes(
     user_id: CurrentUserID = None,
     price: Optional[Decimal] = Query(None),
-    service: WishListService = Depends(),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[int] = Query(None, ge=0),
+    service: WishListService = Depends(get_wish_list_service),
 ):
-    return service.get_all_by_user_id(user_id, price)
+    return FastJSONResponse(await service.get_all_by_user_id(user_id, price, cursor, limit))
 
 
 # .../5
-@router.get("/{id}")
+@router.get("/{id}", response_model=WishListDetailedResponse)
 @authorize
 async def get_wish_by_id(
     id: int,
     user_id: CurrentUserID = None,
-    service: WishListService = Depends(),
+    if_none_match: Optional[str] = Header(None),
+    service: WishListService = Depends(get_wish_list_service),
 ):
-    return service.get_by_id(id, user_id)
+    versioned = await service.get_versioned(id, user_id, _versions(if_none_match))
+    if versioned.wish is None:
+        return Response(status_code=304, headers=_etag(versioned.version))
+    return FastJSONResponse(versioned.wish, headers=_etag(versioned.version))
 
 
 # .../
-@router.post("")
+@router.post("", response_model=WishListCreatedResponse)
 @authorize
 async def create_wish(
     data: WishListPost,
     user_id: CurrentUserID = None,
-    service: WishListService = Depends(),
+    service: WishListService = Depends(get_wish_list_service),
 ):
     info = WishListCreate()
     info.user_id = user_id
     info.title = data.info.title
     info.description = data.info.description
     info.estimate_price = data.info.estimate_price
-    return {"wish_list_id": service.create(info, data.notes)}
+    return FastJSONResponse({"wish_list_id": await service.create(info, data.notes)})
 
 
 # .../5
-@router.put("/{id}")
+@router.put("/{id}", response_model=SuccessResponse)
 @authorize
 async def update_wish(
     id: int,
     data: WishListPut,
     user_id: CurrentUserID = None,
-    service: WishListService = Depends(),
+    if_match: Optional[str] = Header(None),
+    service: WishListService = Depends(get_wish_list_service),
 ):
-    return {"success": service.update(id, data, user_id)}
+    version = await service.update(id, data, user_id, _versions(if_match))
+    return FastJSONResponse({"success": True}, headers=_etag(version))
 
 
 # .../5
-@router.delete("/{id}")
+@router.delete("/{id}", response_model=SuccessResponse)
 @authorize
 async def delete_wish(
     id: int,
     user_id: CurrentUserID = None,
-    service: WishListService = Depends(),
+    service: WishListService = Depends(get_wish_list_service),
 ):
-    return {"success": service.delete(id, user_id)}
+    return FastJSONResponse({"success": await service.delete(id, user_id)})
 
 
 # .../5/notes
-@router.post("/{id}/notes")
+@router.post("/{id}/notes", response_model=SuccessResponse)
 @authorize
 async def create_notes(
     id: int,
     data: WishNotePost,
     user_id: CurrentUserID = None,
-    service: WishListService = Depends(),
+    if_match: Optional[str] = Header(None),
+    service: WishListService = Depends(get_wish_list_service),
 ):
-    return {"success": service.add_notes(id, data.notes, user_id)}
+    version = await service.add_notes(id, data.notes, user_id, _versions(if_match))
+    return FastJSONResponse({"success": True}, headers=_etag(version))
 
 
 # .../5/notes
-@router.put("/{id}/notes")
+@router.put("/{id}/notes", response_model=NoteResultsResponse)
 @authorize
 async def update_notes(
     id: int,
     data: WishNotePut,
     user_id: CurrentUserID = None,
-    service: WishListService = Depends(),
+    if_match: Optional[str] = Header(None),
+    service: WishListService = Depends(get_wish_list_service),
 ):
-    return {"success": service.update_notes(id, data.notes, user_id)}
+    return _per_note_results(
+        *await service.update_notes(id, data.notes, user_id, _versions(if_match))
+    )
 
 
 # .../5/notes?ids=1&ids=2
-@router.delete("/{id}/notes")
+@router.delete("/{id}/notes", response_model=NoteResultsResponse)
 @authorize
 async def delete_notes(
     id: int,
     user_id: CurrentUserID = None,
     ids: list[int] = Query([]),
-    service: WishListService = Depends(),
+    if_match: Optional[str] = Header(None),
+    service: WishListService = Depends(get_wish_list_service),
 ):
-    return {"success": service.delete_notes(id, ids, user_id)}
+    return _per_note_results(*await service.delete_notes(id, ids, user_id, _versions(if_match)))
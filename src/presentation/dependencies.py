@@ -3,10 +3,23 @@ from typing import Annotated, Callable
 
 from fastapi import Depends, HTTPException, Request, status
 
+from src.app.container import get_container
 from src.use_cases.auth import AuthService
+from src.use_cases.wish_list import WishListService
 
 
-def get_current_user_id(request: Request, auth_service: AuthService = Depends()) -> int | None:
+# async so that FastAPI resolves them on the event loop instead of a worker thread
+async def get_auth_service() -> AuthService:
+    return get_container().auth_service
+
+
+async def get_wish_list_service() -> WishListService:
+    return get_container().wish_list_service
+
+
+async def get_current_user_id(
+    request: Request, auth_service: AuthService = Depends(get_auth_service)
+) -> int | None:
     """Extract user_id from JWT token in Authorization header"""
     auth_header = request.headers.get("authorization")
     if not auth_header or not auth_header.lower().startswith("bearer "):
@@ -1,111 +1,99 @@
+from functools import lru_cache
+
 from fastapi import HTTPException, Request, status
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
 from pydantic import ValidationError
 
-from src.domain.errors import WishNotFoundError
+from src.domain.errors import ServiceOverloadedError, WishNotFoundError, WishVersionMismatchError
+from src.infrastructure.settings import get_settings
 from src.presentation.models.api_error import ApiError
-from src.presentation.models.rfc7807 import create_problem_detail, create_security_problem_detail
+from src.presentation.problems import ProblemType
 
+_VALIDATION_ERROR_TYPE = "https://wishlist.example.com/problems/validation-error"
+_WISH_NOT_FOUND = ProblemType(
+    "https://wishlist.example.com/problems/wish-not-found",
+    "Wish Not Found",
+    status.HTTP_404_NOT_FOUND,
+)
+_WISH_VERSION_MISMATCH = ProblemType(
+    "https://wishlist.example.com/problems/precondition-failed",
+    "Precondition Failed",
+    status.HTTP_412_PRECONDITION_FAILED,
+)
+_SERVICE_OVERLOADED = ProblemType(
+    "https://wishlist.example.com/problems/service-overloaded",
+    "Service Overloaded",
+    status.HTTP_503_SERVICE_UNAVAILABLE,
+)
+# problem types whose status comes from the exception, built on first use
+_api_errors: dict[int, ProblemType] = {}
 
-async def api_error_handler(request: Request, ex: ApiError):
-    problem = create_problem_detail(
-        status=ex.status,
-        title="API Error",
-        detail=ex.message,
-        type_="https://wishlist.example.com/problems/api-error",
-        instance=str(request.url),
-    )
-    return JSONResponse(
-        status_code=ex.status,
-        content=problem.model_dump(exclude_none=True),
-        headers={"Content-Type": "application/problem+json"},
+
+@lru_cache(maxsize=None)
+def _masked(type_: str, title: str, status_code: int) -> ProblemType:
+    """A security problem: its details are hidden in production (see
+    SecurityProblemDetail). Built on first use, once the settings are loaded.
+    """
+    return ProblemType(type_, title, status_code, mask=get_settings().environment == "production")
+
+
+def _api_error(status_code: int) -> ProblemType:
+    problem = _api_errors.get(status_code)
+    if problem is None:
+        problem = _api_errors[status_code] = ProblemType(
+            "https://wishlist.example.com/problems/api-error", "API Error", status_code
+        )
+    return problem
+
+
+def _http_error(status_code: int) -> ProblemType:
+    return _masked("https://wishlist.example.com/problems/http-error", "HTTP Error", status_code)
+
+
+def _request_validation_error() -> ProblemType:
+    # a literal: starlette renamed the constant in 0.48 and requirements allow 0.47
+    return _masked(_VALIDATION_ERROR_TYPE, "Validation Error", 422)
+
+
+def _describe(errors: list[dict]) -> str:
+    return "; ".join(
+        f"{' -> '.join(str(x) for x in error['loc'])}: {error['msg']}" for error in errors
     )
 
 
+async def api_error_handler(request: Request, ex: ApiError):
+    return _api_error(ex.status).response(ex.message, str(request.url))
+
+
 async def value_error_handler(request: Request, ex: ValueError):
-    problem = create_security_problem_detail(
-        status=status.HTTP_400_BAD_REQUEST,
-        title="Validation Error",
-        detail=str(ex),
-        type_="https://wishlist.example.com/problems/validation-error",
-        instance=str(request.url),
-    )
-    return JSONResponse(
-        status_code=status.HTTP_400_BAD_REQUEST,
-        content=problem.model_dump(exclude_none=True),
-        headers={"Content-Type": "application/problem+json"},
-    )
+    problem = _masked(_VALIDATION_ERROR_TYPE, "Validation Error", status.HTTP_400_BAD_REQUEST)
+    return problem.response(str(ex), str(request.url))
 
 
 async def wish_not_found_handler(request: Request, ex: WishNotFoundError):
-    problem = create_problem_detail(
-        status=status.HTTP_404_NOT_FOUND,
-        title="Wish Not Found",
-        detail=str(ex),
-        type_="https://wishlist.example.com/problems/wish-not-found",
-        instance=str(request.url),
-    )
-    return JSONResponse(
-        status_code=status.HTTP_404_NOT_FOUND,
-        content=problem.model_dump(exclude_none=True),
-        headers={"Content-Type": "application/problem+json"},
+    return _WISH_NOT_FOUND.response(str(ex), str(request.url))
+
+
+async def wish_version_mismatch_handler(request: Request, ex: WishVersionMismatchError):
+    return _WISH_VERSION_MISMATCH.response(str(ex), str(request.url))
+
+
+async def service_overloaded_handler(request: Request, ex: ServiceOverloadedError):
+    return _SERVICE_OVERLOADED.response(
+        "Too many concurrent requests. Please try again later.",
+        str(request.url),
+        [(b"retry-after", str(ex.retry_after).encode())],
     )
 
 
 async def request_validation_error_handler(request: Request, ex: RequestValidationError):
-    errors = []
-    for error in ex.errors():
-        field = " -> ".join(str(x) for x in error["loc"])
-        message = error["msg"]
-        errors.append(f"{field}: {message}")
-
-    problem = create_security_problem_detail(
-        status=status.HTTP_422_UNPROCESSABLE_ENTITY,
-        title="Validation Error",
-        detail="; ".join(errors),
-        type_="https://wishlist.example.com/problems/validation-error",
-        instance=str(request.url),
-    )
-    return JSONResponse(
-        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-        content=problem.model_dump(exclude_none=True),
-        headers={"Content-Type": "application/problem+json"},
-    )
+    return _request_validation_error().response(_describe(ex.errors()), str(request.url))
 
 
 async def validation_error_handler(request: Request, ex: ValidationError):
-    errors = []
-    for error in ex.errors():
-        field = " -> ".join(str(x) for x in error["loc"])
-        message = error["msg"]
-        errors.append(f"{field}: {message}")
-
-    problem = create_security_problem_detail(
-        status=status.HTTP_422_UNPROCESSABLE_ENTITY,
-        title="Validation Error",
-        detail="; ".join(errors),
-        type_="https://wishlist.example.com/problems/validation-error",
-        instance=str(request.url),
-    )
-    return JSONResponse(
-        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-        content=problem.model_dump(exclude_none=True),
-        headers={"Content-Type": "application/problem+json"},
-    )
+    return _request_validation_error().response(_describe(ex.errors()), str(request.url))
 
 
 async def http_exception_handler(request: Request, ex: HTTPException):
     detail = ex.detail if isinstance(ex.detail, str) else "HTTP Error"
-    problem = create_security_problem_detail(
-        status=ex.status_code,
-        title="HTTP Error",
-        detail=detail,
-        type_="https://wishlist.example.com/problems/http-error",
-        instance=str(request.url),
-    )
-    return JSONResponse(
-        status_code=ex.status_code,
-        content=problem.model_dump(exclude_none=True),
-        headers={"Content-Type": "application/problem+json"},
-    )
+    return _http_error(ex.status_code).response(detail, str(request.url))
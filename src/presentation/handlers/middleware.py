@@ -1,10 +1,10 @@
 from typing import Any, Awaitable, Callable
 
 from fastapi.responses import PlainTextResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers
 
 
-class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
+class RequestSizeLimitMiddleware:
     """Rejects requests whose Content-Length exceeds the configured limit.
 
     This middleware relies on the Content-Length header. If the header is
@@ -12,14 +12,20 @@ class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
     """
 
     def __init__(self, app: Callable[..., Awaitable[Any]], max_body_size: int) -> None:
-        super().__init__(app)
+        self.app = app
         self.max_body_size = max_body_size
 
-    async def dispatch(self, request, call_next):  # type: ignore[override]
-        content_length = request.headers.get("content-length")
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        content_length = Headers(scope=scope).get("content-length")
 
         if content_length and content_length.isdigit():
             if int(content_length) > self.max_body_size:
-                return PlainTextResponse("Request payload too large", status_code=413)
+                response = PlainTextResponse("Request payload too large", status_code=413)
+                await response(scope, receive, send)
+                return
 
-        return await call_next(request)
+        await self.app(scope, receive, send)
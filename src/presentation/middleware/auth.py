@@ -2,7 +2,7 @@ from typing import Awaitable, Callable
 
 from fastapi import Request
 
-from src.use_cases.auth import AuthService
+from src.app.container import get_container
 
 
 class AuthMiddleware:
@@ -14,12 +14,14 @@ class AuthMiddleware:
                 "/api/health",
                 "/api/auth/login",
                 "/api/auth/register",
+                "/api/auth/refresh",
+                "/api/auth/logout",
                 "/openapi.json",
                 "/docs",
                 "/redoc",
             ]
         )
-        self._auth_service = AuthService()
+        self._auth_service = get_container().auth_service
 
     async def __call__(self, scope, receive, send):
         if scope["type"] != "http":
@@ -39,31 +41,11 @@ class AuthMiddleware:
 
         token = auth_header.split(" ", 1)[1]
         user_id = self._auth_service.verify_token(token)
-        if user_id is None:
+        # both answers are usually served from memory
+        if user_id is None or not await self._auth_service.is_active(user_id):
             await self._reject(send)
             return
 
-        # check if user is blocked
-        from datetime import datetime, timezone
-
-        from src.infrastructure.persistence.auth import UsersRepository
-
-        repo = UsersRepository()
-        user = repo.get_by_id(user_id)
-        if user is None:
-            await self._reject(send)
-            return
-        if user.blocked_until is not None:
-            now = datetime.now(timezone.utc)
-            when = (
-                user.blocked_until
-                if user.blocked_until.tzinfo is not None
-                else user.blocked_until.replace(tzinfo=timezone.utc)
-            )
-            if when > now:
-                await self._reject(send)
-                return
-
         scope["user_id"] = user_id
         await self.app(scope, receive, send)
 
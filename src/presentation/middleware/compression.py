@@ -0,0 +1,212 @@
+import threading
+import zlib
+from typing import Optional
+
+try:  # optional: pip install brotli
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+# JSON and text compress well; images, archives and problem documents
+# (small, and often answered to clients we would rather spend no CPU on) do not
+_COMPRESSIBLE = (b"application/json", b"text/")
+_VARY = (b"vary", b"Accept-Encoding")
+
+
+def negotiate(accept_encoding: str, brotli_available: bool = brotli is not None) -> Optional[str]:
+    """Pick "br" or "gzip" from an Accept-Encoding value, None for identity.
+
+    Codings with q=0 are refused; the highest q wins and br wins ties. "*"
+    only stands for the codings that are not listed on their own.
+    """
+    accepted: dict[str, float] = {}
+    wildcard = None
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        params = params.strip().lower()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding == "*":
+            wildcard = q
+        else:
+            accepted[coding] = q
+    if wildcard is not None:
+        for coding in ("br", "gzip"):
+            accepted.setdefault(coding, wildcard)
+
+    best, best_q = None, 0.0
+    for coding in ("br", "gzip"):
+        if coding == "br" and not brotli_available:
+            continue
+        q = accepted.get(coding, 0.0)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class _Gzip:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip container
+
+    def compress(self, data: bytes) -> bytes:
+        # sync flush so a streamed chunk reaches the client without waiting for the next
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class _Brotli:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+class CompressionStats:
+    """Bytes before and after compression, per route template."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._routes: dict[str, list[int]] = {}
+
+    def record(self, route: str, original: int, compressed: int) -> None:
+        with self._lock:
+            counters = self._routes.get(route)
+            if counters is None:
+                counters = self._routes[route] = [0, 0, 0]
+            counters[0] += 1
+            counters[1] += original
+            counters[2] += compressed
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            return {
+                route: {
+                    "responses": responses,
+                    "bytes_in": original,
+                    "bytes_out": compressed,
+                    "bytes_saved": original - compressed,
+                }
+                for route, (responses, original, compressed) in self._routes.items()
+            }
+
+
+class CompressionMiddleware:
+    """Compresses JSON and text responses with brotli or gzip.
+
+    Bodies below minimum_size that arrive in one message are sent as is;
+    streamed bodies are compressed chunk by chunk. Responses that already
+    have a Content-Encoding, problem documents and other content types pass
+    through untouched.
+
+    ETags are left as they are, so that a 304 carries the same validator as
+    the 200: routes whose responses may be compressed send weak ones.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        gzip_level: int = 5,
+        brotli_quality: int = 4,
+        stats: CompressionStats | None = None,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.stats = stats if stats is not None else CompressionStats()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        coding = negotiate(accept_encoding) if accept_encoding else None
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        encoder = None
+        original = compressed = 0
+
+        async def send_compressed(message):
+            nonlocal start, encoder, original, compressed
+            if message["type"] == "http.response.start":
+                # held back until the first body chunk decides on compression
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                held, start = start, None
+                if not self._should_compress(held, body, more_body):
+                    await send(held)
+                    await send(message)
+                    return
+                encoder = _Brotli(self.brotli_quality) if coding == "br" else _Gzip(self.gzip_level)
+                headers = self._compressed_headers(held, coding)
+                if not more_body:
+                    chunk = encoder.finish(body)
+                    headers.append((b"content-length", str(len(chunk)).encode()))
+                    await send({**held, "headers": headers})
+                    await send({"type": "http.response.body", "body": chunk})
+                    self._record(scope, len(body), len(chunk))
+                    return
+                await send({**held, "headers": headers})
+            elif encoder is None:
+                await send(message)
+                return
+
+            chunk = encoder.compress(body) if more_body else encoder.finish(body)
+            original += len(body)
+            compressed += len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+            if not more_body:
+                self._record(scope, original, compressed)
+
+        await self.app(scope, receive, send_compressed)
+
+    def _should_compress(self, start, body: bytes, more_body: bool) -> bool:
+        if not more_body and len(body) < self.minimum_size:
+            return False
+        content_type = b""
+        for name, value in start.get("headers", ()):
+            if name == b"content-encoding":
+                return False
+            if name == b"content-type":
+                content_type = value
+        return content_type.startswith(_COMPRESSIBLE)
+
+    @staticmethod
+    def _compressed_headers(start, coding: str) -> list[tuple[bytes, bytes]]:
+        headers = []
+        for name, value in start.get("headers", ()):
+            if name != b"content-length":
+                headers.append((name, value))
+        headers += [(b"content-encoding", coding.encode()), _VARY]
+        return headers
+
+    def _record(self, scope, original: int, compressed: int) -> None:
+        route = scope.get("route")
+        self.stats.record(getattr(route, "path", "unmatched"), original, compressed)
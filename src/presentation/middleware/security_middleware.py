@@ -1,147 +1,189 @@
 import logging
-import time
-from collections import defaultdict, deque
+import math
 from typing import List
 
 from fastapi import Request, Response
-from fastapi.responses import JSONResponse
+from starlette.datastructures import URL, Headers
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from src.infrastructure.rate_limit.base import Limit, RateLimiter
+from src.infrastructure.rate_limit.memory import InMemoryRateLimiter
+from src.presentation.problems import ProblemType
+
 logger = logging.getLogger(__name__)
 
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+_HSTS = (b"strict-transport-security", b"max-age=31536000; includeSubDomains")
+_COMMON_HEADERS = [
+    _HSTS,
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"x-xss-protection", b"1; mode=block"),
+    (b"referrer-policy", b"strict-origin-when-cross-origin"),
+]
+_DOCS_CSP = (
+    b"default-src 'self'; "
+    b"script-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
+    b"style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
+    b"img-src 'self' https://fastapi.tiangolo.com; "
+    b"font-src 'self' https://cdn.jsdelivr.net;"
+)
+_DEFAULT_CSP = (
+    b"default-src 'self'; script-src 'self' 'unsafe-inline'; style-src 'self' 'unsafe-inline'"
+)
+
+
+class SecurityHeadersMiddleware:
     """Middleware to add security headers to all responses"""
 
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-
-        # Security headers
-        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-
-        if request.url.path.startswith("/docs"):
-            response.headers["Content-Security-Policy"] = (
-                "default-src 'self'; "
-                "script-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
-                "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
-                "img-src 'self' https://fastapi.tiangolo.com; "
-                "font-src 'self' https://cdn.jsdelivr.net;"
-            )
-        else:
-            response.headers["Content-Security-Policy"] = (
-                "default-src 'self'; "
-                "script-src 'self' 'unsafe-inline'; "
-                "style-src 'self' 'unsafe-inline'"
+    _docs_headers = _COMMON_HEADERS + [(b"content-security-policy", _DOCS_CSP)]
+    _default_headers = _COMMON_HEADERS + [(b"content-security-policy", _DEFAULT_CSP)]
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        extra = self._docs_headers if scope["path"].startswith("/docs") else self._default_headers
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *extra]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+def _client_ip(scope) -> str:
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class RateLimitMiddleware:
+    """Middleware for rate limiting requests
+
+    Applies a sustained limit (requests_per_minute) and a burst limit
+    (burst_limit per 10 seconds) per client IP, both as GCRA buckets: a
+    client may send a full bucket at once, then at the steady rate.
+    """
+
+    _problems = {
+        "rate": (
+            ProblemType(
+                "https://wishlist.example.com/problems/rate-limit-exceeded",
+                "Rate Limit Exceeded",
+                429,
+            ),
+            "Too many requests. Please try again later.",
+        ),
+        "burst": (
+            ProblemType(
+                "https://wishlist.example.com/problems/burst-limit-exceeded",
+                "Burst Limit Exceeded",
+                429,
+            ),
+            "Too many requests in short time. Please slow down.",
+        ),
+    }
+
+    def __init__(
+        self,
+        app,
+        requests_per_minute: int = 100,
+        burst_limit: int = 20,
+        max_clients: int = 100_000,
+        limiter: RateLimiter | None = None,
+    ):
+        self.app = app
+        # a given limiter (shared backends) carries its own limits
+        self._limiter = (
+            limiter
+            if limiter is not None
+            else InMemoryRateLimiter(
+                {"rate": Limit(requests_per_minute, 60), "burst": Limit(burst_limit, 10)},
+                max_keys=max_clients,
             )
+        )
 
-        return response
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
+        client_ip = _client_ip(scope)
+        decision = await self._limiter.acquire(client_ip)
+        if decision.allowed:
+            await self.app(scope, receive, send)
+            return
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Middleware for rate limiting requests"""
+        logger.warning(f"{decision.exceeded.capitalize()} limit exceeded for IP: {client_ip}")
+        problem, detail = self._problems[decision.exceeded]
+        response = problem.response(
+            detail, headers=[(b"retry-after", str(math.ceil(decision.retry_after)).encode())]
+        )
+        await response(scope, receive, send)
 
-    def __init__(self, app, requests_per_minute: int = 100, burst_limit: int = 20):
-        super().__init__(app)
-        self.requests_per_minute = requests_per_minute
-        self.burst_limit = burst_limit
-        # Use instance variables instead of class variables
-        self._requests = defaultdict(lambda: deque())
-        self._blocked_ips = set()
 
-    async def dispatch(self, request: Request, call_next):
-        client_ip = request.client.host if request.client else "unknown"
-        current_time = time.time()
-
-        # Clean old requests (older than 1 minute)
-        if client_ip in self._requests:
-            while self._requests[client_ip] and current_time - self._requests[client_ip][0] > 60:
-                self._requests[client_ip].popleft()
-
-        # Check rate limit
-        if len(self._requests[client_ip]) >= self.requests_per_minute:
-            logger.warning(f"Rate limit exceeded for IP: {client_ip}")
-            return JSONResponse(
-                status_code=429,
-                content={
-                    "type": "https://wishlist.example.com/problems/rate-limit-exceeded",
-                    "title": "Rate Limit Exceeded",
-                    "status": 429,
-                    "detail": "Too many requests. Please try again later.",
-                    "correlation_id": str(int(current_time)),
-                },
-                headers={"Content-Type": "application/problem+json"},
-            )
+class SecurityLoggingMiddleware:
+    """Middleware for security event logging"""
 
-        # Check burst limit
-        recent_requests = [
-            req_time for req_time in self._requests[client_ip] if current_time - req_time < 10
-        ]
-        if len(recent_requests) >= self.burst_limit:
-            logger.warning(f"Burst limit exceeded for IP: {client_ip}")
-            return JSONResponse(
-                status_code=429,
-                content={
-                    "type": "https://wishlist.example.com/problems/burst-limit-exceeded",
-                    "title": "Burst Limit Exceeded",
-                    "status": 429,
-                    "detail": "Too many requests in short time. Please slow down.",
-                    "correlation_id": str(int(current_time)),
-                },
-                headers={"Content-Type": "application/problem+json"},
-            )
+    suspicious_patterns = (
+        "..",  # Path traversal
+        "<script",  # XSS attempt
+        "union select",  # SQL injection
+        "javascript:",  # XSS attempt
+        "eval(",  # Code injection
+    )
 
-        # Record this request
-        self._requests[client_ip].append(current_time)
+    def __init__(self, app) -> None:
+        self.app = app
 
-        response = await call_next(request)
-        return response
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
+        client_ip = _client_ip(scope)
 
-class SecurityLoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware for security event logging"""
+        # Log suspicious patterns
+        if self._is_suspicious_request(scope):
+            logger.warning(
+                f"Suspicious request from {client_ip}: {scope['method']} {URL(scope=scope)}"
+            )
 
-    async def dispatch(self, request: Request, call_next):
-        # start_time = time.time()
-        # user_agent = request.headers.get("user-agent", "unknown")
-        client_ip = request.client.host if request.client else "unknown"
+        status_code = 500
 
-        # Log suspicious patterns
-        if self._is_suspicious_request(request):
-            logger.warning(f"Suspicious request from {client_ip}: {request.method} {request.url}")
+        async def send_capturing_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
 
-        response = await call_next(request)
+        await self.app(scope, receive, send_capturing_status)
 
         # Log security events
-        if response.status_code >= 400:
+        if status_code >= 400:
             logger.warning(
-                f"Error response {response.status_code} "
-                f"for {request.method} {request.url} from {client_ip}"
+                f"Error response {status_code} "
+                f"for {scope['method']} {URL(scope=scope)} from {client_ip}"
             )
 
         # Log large requests
-        content_length = request.headers.get("content-length")
-        if content_length and int(content_length) > 1000000:  # 1MB
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > 1000000:  # 1MB
             logger.info(f"Large request ({content_length} bytes) from {client_ip}")
 
-        return response
-
-    def _is_suspicious_request(self, request: Request) -> bool:
+    def _is_suspicious_request(self, scope) -> bool:
         """Check for suspicious request patterns"""
-        suspicious_patterns = [
-            "..",  # Path traversal
-            "<script",  # XSS attempt
-            "union select",  # SQL injection
-            "javascript:",  # XSS attempt
-            "eval(",  # Code injection
-        ]
-
-        url_str = str(request.url).lower()
-        for pattern in suspicious_patterns:
-            if pattern in url_str:
+        target = scope["path"]
+        if scope["query_string"]:
+            target = f"{target}?{scope['query_string'].decode('latin-1')}"
+        target = target.lower()
+        for pattern in self.suspicious_patterns:
+            if pattern in target:
                 return True
 
         return False
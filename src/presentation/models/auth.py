@@ -32,9 +32,14 @@ class LoginRequest(BaseModel):
 
 class TokenResponse(BaseModel):
     access_token: str
+    refresh_token: str
     token_type: str = "bearer"
 
 
+class RefreshRequest(BaseModel):
+    refresh_token: str = Field(min_length=1, max_length=128)
+
+
 class BlockUserRequest(BaseModel):
     user_id: int
     # ISO 8601 datetime string
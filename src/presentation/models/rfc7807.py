@@ -3,6 +3,9 @@ from uuid import uuid4
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from src.infrastructure.settings import get_settings
+from src.presentation.problems import MASKED_DETAIL
+
 
 class ProblemDetail(BaseModel):
     """RFC 7807 Problem Details for HTTP APIs"""
@@ -48,10 +51,8 @@ class SecurityProblemDetail(ProblemDetail):
         super().__init__(**data)
 
         # In production, mask internal details
-        import os
-
-        if os.getenv("ENVIRONMENT") == "production":
-            self.detail = "An error occurred while processing your request"
+        if get_settings().environment == "production":
+            self.detail = MASKED_DETAIL
             self.type = "about:blank"
 
 
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
 from src.domain.models import WishListUpdate, WishNoteCreate, WishNoteUpdate
@@ -32,3 +34,46 @@ class WishNoteUpdatePydantic(BaseModel, WishNoteUpdate):
 
 class WishNotePut(BaseModel):
     notes: list[WishNoteUpdatePydantic]
+
+
+class WishListResponse(BaseModel):
+    wish_list_id: int
+    user_id: int
+    title: str
+    description: str
+    estimate_price: float
+    link: Optional[str]
+
+
+class WishNoteResponse(BaseModel):
+    wish_note_id: int
+    wish_list_id: int
+    title: str
+    description: str
+    received: bool
+
+
+class WishListDetailedResponse(WishListResponse):
+    notes: list[WishNoteResponse]
+
+
+class WishListPageResponse(BaseModel):
+    items: list[WishListResponse]
+    next_cursor: Optional[int]
+
+
+class WishListCreatedResponse(BaseModel):
+    wish_list_id: int
+
+
+class SuccessResponse(BaseModel):
+    success: bool
+
+
+class NoteResult(BaseModel):
+    wish_note_id: int
+    success: bool
+
+
+class NoteResultsResponse(SuccessResponse):
+    results: list[NoteResult]
@@ -0,0 +1,25 @@
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.encoders import decimal_encoder
+from fastapi.responses import JSONResponse
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        # same numbers as jsonable_encoder: int without a fraction, float otherwise
+        return decimal_encoder(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """Serialises dataclasses, dicts, lists and Decimals straight to bytes with orjson.
+
+    Routes return it instead of the bare object, so FastAPI skips
+    jsonable_encoder and response_model validation; the route's
+    response_model then only documents the shape.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default)
@@ -1,7 +1,28 @@
 import html
 import re
 from pathlib import Path
-from typing import Any, List
+from typing import Any, List, Sequence
+
+# SQL keywords and tautologies like "or 1=1", matched against lowercased text:
+# one alternation, and a case-sensitive search is about twice as fast as
+# re.IGNORECASE. The lookahead skips word starts that cannot match.
+_SQL_WORDS_RE = re.compile(
+    r"\b(?=[aceiosud])(?:"
+    r"(?:select|insert|update|delete|drop|create|alter|exec|union)\b"
+    r"|(?:or|and)\s+\d+\s*=\s*\d+)"
+)
+# SQL comment markers. Kept as a separate pass: as plain literals they are
+# found by a fast scan, which an alternation with the patterns above defeats.
+_SQL_COMMENT_RE = re.compile(r"--|#|/\*|\*/")
+_EMAIL_RE = re.compile(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
+_URL_RE = re.compile(r"^https?://[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}(/.*)?$")
+_SCRIPT_TAG_RE = re.compile(r"<script\b[^<]*(?:(?!<\/script>)<[^<]*)*<\/script>", re.IGNORECASE)
+_JAVASCRIPT_PROTOCOL_RE = re.compile(r"javascript:", re.IGNORECASE)
+_EVENT_HANDLER_RE = re.compile(r'\son\w+\s*=\s*["\'][^"\']*["\']', re.IGNORECASE)
+
+# Joins texts for validate_many. Not whitespace and not a word character, so
+# no pattern above can match across two texts and \b sees a text boundary.
+_SEPARATOR = "\x00"
 
 
 class InputValidationError(ValueError):
@@ -10,12 +31,16 @@ class InputValidationError(ValueError):
     pass
 
 
-def validate_text_content(text: str, field_name: str, max_length: int = 1000) -> str:
-    """Validate and sanitize text content"""
+def _looks_like_sql(text: str) -> bool:
+    return bool(_SQL_COMMENT_RE.search(text) or _SQL_WORDS_RE.search(text.lower()))
+
+
+def _check_text(text: str, field_name: str, max_length: int) -> str:
     if not isinstance(text, str):
         raise InputValidationError(f"{field_name} must be a string")
 
-    if len(text.strip()) == 0:
+    stripped = text.strip()
+    if len(stripped) == 0:
         raise InputValidationError(f"{field_name} cannot be empty")
 
     if len(text) > max_length:
@@ -23,21 +48,40 @@ def validate_text_content(text: str, field_name: str, max_length: int = 1000) ->
             f"{field_name} exceeds maximum length of {max_length} characters"
         )
 
-    # Check for SQL injection patterns
-    sql_patterns = [
-        r"(\b(SELECT|INSERT|UPDATE|DELETE|DROP|CREATE|ALTER|EXEC|UNION)\b)",
-        r"(\b(OR|AND)\s+\d+\s*=\s*\d+)",
-        r"(--|\#|\/\*|\*\/)",
-    ]
+    return stripped
+
+
+def validate_text_content(text: str, field_name: str, max_length: int = 1000) -> str:
+    """Validate and sanitize text content"""
+    stripped = _check_text(text, field_name, max_length)
 
-    for pattern in sql_patterns:
-        if re.search(pattern, text, re.IGNORECASE):
-            raise InputValidationError(f"{field_name} contains potentially malicious content")
+    # Check for SQL injection patterns
+    if _looks_like_sql(text):
+        raise InputValidationError(f"{field_name} contains potentially malicious content")
 
     # HTML sanitization
-    sanitized = html.escape(text.strip())
+    return html.escape(stripped)
+
+
+def validate_many(texts: Sequence[str], field_name: str, max_length: int = 1000) -> list[str]:
+    """validate_text_content for a whole list (e.g. note titles) in one regex pass.
+
+    Errors name the offending item as field_name[index].
+    """
+    stripped = [_check_text(text, f"{field_name}[{i}]", max_length) for i, text in enumerate(texts)]
+    if not stripped:
+        return []
+
+    if _looks_like_sql(_SEPARATOR.join(texts)):
+        # rare path: find the offending item
+        index = next(i for i, text in enumerate(texts) if _looks_like_sql(text))
+        raise InputValidationError(f"{field_name}[{index}] contains potentially malicious content")
 
-    return sanitized
+    # html.escape leaves the separator alone
+    escaped = html.escape(_SEPARATOR.join(stripped)).split(_SEPARATOR)
+    if len(escaped) != len(stripped):  # a text contained the separator itself
+        escaped = [html.escape(text) for text in stripped]
+    return escaped
 
 
 def validate_numeric_range(
@@ -80,8 +124,7 @@ def validate_email(email: str) -> str:
     if not isinstance(email, str):
         raise InputValidationError("Email must be a string")
 
-    email_pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
-    if not re.match(email_pattern, email):
+    if not _EMAIL_RE.match(email):
         raise InputValidationError("Invalid email format")
 
     return email.lower().strip()
@@ -92,8 +135,7 @@ def validate_url(url: str) -> str:
     if not isinstance(url, str):
         raise InputValidationError("URL must be a string")
 
-    url_pattern = r"^https?://[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}(/.*)?$"
-    if not re.match(url_pattern, url):
+    if not _URL_RE.match(url):
         raise InputValidationError("Invalid URL format")
 
     return url.strip()
@@ -102,14 +144,12 @@ def validate_url(url: str) -> str:
 def sanitize_html_content(html_content: str) -> str:
     """Sanitize HTML content by removing potentially dangerous tags"""
     # Remove script tags and their content
-    html_content = re.sub(
-        r"<script\b[^<]*(?:(?!<\/script>)<[^<]*)*<\/script>", "", html_content, flags=re.IGNORECASE
-    )
+    html_content = _SCRIPT_TAG_RE.sub("", html_content)
 
     # Remove javascript: protocols
-    html_content = re.sub(r"javascript:", "", html_content, flags=re.IGNORECASE)
+    html_content = _JAVASCRIPT_PROTOCOL_RE.sub("", html_content)
 
     # Remove on* event handlers
-    html_content = re.sub(r'\son\w+\s*=\s*["\'][^"\']*["\']', "", html_content, flags=re.IGNORECASE)
+    html_content = _EVENT_HANDLER_RE.sub("", html_content)
 
     return html_content
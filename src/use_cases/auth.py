@@ -1,22 +1,65 @@
-import os
+import hashlib
+import secrets
+import time
+import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 import jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import HTTPException, status
 
-from src.domain.auth import UserCreate, UserPublic
-from src.infrastructure.persistence.auth import UsersRepository
+from src.domain.auth import TokenPair, UserCreate, UserPublic
+from src.infrastructure.cache import TTLCache
+from src.infrastructure.password_hasher import PasswordHasher
+from src.infrastructure.persistence.auth import RefreshTokensRepository, UsersRepository
+from src.infrastructure.settings import Settings
+
+_NO_USER = object()
+_MISSING = object()
+
+
+def _token_hash(token: str) -> bytes:
+    # refresh tokens are 256 random bits, a fast hash is enough to store them
+    return hashlib.sha256(token.encode()).digest()
+
+
+def _as_utc(value: datetime) -> datetime:
+    # assume UTC if naive
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
 
 
 class AuthService:
-    def __init__(self, users_repo: UsersRepository = Depends()):
+    # consecutive failed logins that block the user, and for how long
+    MAX_FAILED_ATTEMPTS = 5
+    BLOCK_DURATION = timedelta(minutes=10)
+
+    def __init__(
+        self,
+        users_repo: UsersRepository,
+        refresh_tokens: RefreshTokensRepository,
+        password_hasher: PasswordHasher,
+        settings: Settings,
+    ):
         self._users = users_repo
-        self._jwt_secret = os.getenv("JWT_SECRET", "WishList Jwt Secret")
-        self._jwt_algo = os.getenv("JWT_ALGO", "HS256")
-        self._jwt_exp_minutes = int(os.getenv("JWT_EXP_MINUTES", "60"))
+        self._refresh_tokens = refresh_tokens
+        self._refresh_ttl = timedelta(days=settings.refresh_token_ttl_days)
+        self._hasher = password_hasher
+        self._jwt_secret = settings.jwt_secret
+        self._jwt_algo = settings.jwt_algo
+        self._jwt_algorithms = [settings.jwt_algo]
+        self._jwt_exp_minutes = settings.jwt_exp_minutes
+        # sha256(token) -> user_id of tokens whose signature was already checked
+        self.token_cache: TTLCache[bytes, int] = TTLCache(settings.jwt_cache_size)
+        # user_id -> blocked_until (None: not blocked, _NO_USER: no such user).
+        # Entries are dropped as soon as a block changes (see invalidate_user),
+        # the TTL only bounds staleness if a notification is ever missed.
+        self.user_cache: TTLCache[int, object] = TTLCache(settings.user_cache_size)
+        self._user_cache_ttl = settings.user_cache_ttl_seconds
+        # bumped by every invalidation: a read that raced one is not cached,
+        # it may have seen the row before the block committed
+        self._user_cache_epoch = 0
 
-    def register(self, data: UserCreate) -> UserPublic:
+    async def register(self, data: UserCreate) -> UserPublic:
         email = data.email.strip().lower()
         password = data.password.strip()
 
@@ -27,15 +70,15 @@ class AuthService:
         if len(password.encode("utf-8")) > 72:
             raise ValueError("password too long (max 72 bytes)")
 
-        existing = self._users.get_by_email(email)
-        if existing is not None:
+        password_hash = await self._hasher.hash(password)
+        user_id = await self._users.create(email, password_hash)
+        if user_id is None:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT, detail="email already registered"
             )
-        user_id = self._users.create(UserCreate(email=email, password=password))
         return UserPublic(user_id=user_id, email=email)
 
-    def login(self, email: str, password: str) -> str:
+    async def login(self, email: str, password: str) -> TokenPair:
         email = email.strip().lower()
         password = password.strip()
 
@@ -45,55 +88,109 @@ class AuthService:
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid credentials"
             )
 
-        user = self._users.get_by_email(email)
+        user = await self._users.get_by_email(email)
         if user is None or user.password_hash is None:
             # do not leak whether email exists
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid credentials"
             )
         # block check
-        if user.blocked_until is not None:
-            now = datetime.now(timezone.utc)
-            if user.blocked_until.tzinfo is None:
-                # assume UTC if naive
-                user_blocked_until = user.blocked_until.replace(tzinfo=timezone.utc)
-            else:
-                user_blocked_until = user.blocked_until
-            if user_blocked_until > now:
-                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="user is blocked")
-        if not self._users.verify_password(password, user.password_hash):
-            # track failed attempt and block after 5 consecutive failures for 10 minutes
-            new_count = self._users.increment_failed_attempts(user.user_id)
-            if new_count >= 5:
-                block_until = datetime.now(timezone.utc) + timedelta(minutes=10)
-                self._users.set_block_until(user.user_id, block_until)
-                # reset counter after blocking window starts
-                self._users.reset_failed_attempts(user.user_id)
+        now = datetime.now(timezone.utc)
+        if user.blocked_until is not None and _as_utc(user.blocked_until) > now:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="user is blocked")
+        if not await self._hasher.verify(password, user.password_hash):
+            # one statement counts the failure and blocks on the last allowed one
+            if await self._users.record_failed_login(
+                user.user_id, self.MAX_FAILED_ATTEMPTS, self.BLOCK_DURATION
+            ):
+                self.invalidate_user(user.user_id)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid credentials"
             )
         # successful login resets attempts and clears any past block
-        self._users.reset_failed_attempts(user.user_id)
-        if user.blocked_until is not None:
-            self._users.set_block_until(user.user_id, None)
+        if user.failed_attempts or user.blocked_until is not None:
+            await self._users.record_successful_login(user.user_id)
+        refresh_token = secrets.token_urlsafe(32)
+        await self._refresh_tokens.create(
+            user.user_id,
+            uuid.uuid4(),
+            _token_hash(refresh_token),
+            datetime.now(timezone.utc) + self._refresh_ttl,
+        )
+        return TokenPair(self._access_token(user.user_id, user.email), refresh_token)
+
+    async def refresh(self, refresh_token: str) -> TokenPair:
+        """Trade a refresh token for a new pair; each refresh token works once."""
+        token_hash = _token_hash(refresh_token)
+        new_refresh_token = secrets.token_urlsafe(32)
+        rotated = await self._refresh_tokens.rotate(
+            token_hash,
+            _token_hash(new_refresh_token),
+            datetime.now(timezone.utc) + self._refresh_ttl,
+        )
+        if rotated is None:
+            # a used token coming back means it leaked: end that whole session
+            await self._refresh_tokens.revoke_family(token_hash, only_if_used=True)
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid refresh token"
+            )
+        user_id, email = rotated
+        return TokenPair(self._access_token(user_id, email), new_refresh_token)
+
+    async def logout(self, refresh_token: str) -> None:
+        await self._refresh_tokens.revoke_family(_token_hash(refresh_token))
+
+    def _access_token(self, user_id: int, email: str) -> str:
         now = datetime.now(timezone.utc)
         payload = {
-            "sub": str(user.user_id),
-            "email": user.email,
+            "sub": str(user_id),
+            "email": email,
             "iat": int(now.timestamp()),
             "exp": int((now + timedelta(minutes=self._jwt_exp_minutes)).timestamp()),
         }
         return jwt.encode(payload, self._jwt_secret, algorithm=self._jwt_algo)
 
     def verify_token(self, token: str) -> Optional[int]:
+        digest = hashlib.sha256(token.encode()).digest()
+        user_id = self.token_cache.get(digest)
+        if user_id is not None:
+            return user_id
         try:
-            payload = jwt.decode(token, self._jwt_secret, algorithms=[self._jwt_algo])
+            payload = jwt.decode(token, self._jwt_secret, algorithms=self._jwt_algorithms)
             sub = payload.get("sub")
-            return int(sub) if sub is not None else None
+            user_id = int(sub) if sub is not None else None
         except jwt.PyJWTError:
             return None
+        # tokens without exp never expire by themselves, so they are not cached
+        if user_id is not None and "exp" in payload:
+            self.token_cache.set(digest, user_id, payload["exp"] - time.time())
+        return user_id
 
-    def block_user_until(self, user_id: int, until: datetime) -> None:
+    async def block_user_until(self, user_id: int, until: datetime) -> None:
         # normalize to UTC timezone-aware
-        when = until if until.tzinfo is not None else until.replace(tzinfo=timezone.utc)
-        self._users.set_block_until(user_id, when)
+        await self._users.set_block_until(user_id, _as_utc(until))
+        self.invalidate_user(user_id)
+
+    async def is_active(self, user_id: int) -> bool:
+        """True when the user exists and is not blocked right now."""
+        blocked_until = self.user_cache.get(user_id, _MISSING)
+        if blocked_until is _MISSING:
+            epoch = self._user_cache_epoch
+            user = await self._users.get_by_id(user_id)
+            blocked_until = _NO_USER if user is None else user.blocked_until
+            if epoch == self._user_cache_epoch:
+                self.user_cache.set(user_id, blocked_until, self._user_cache_ttl)
+        if blocked_until is _NO_USER:
+            return False
+        return blocked_until is None or _as_utc(blocked_until) <= datetime.now(timezone.utc)
+
+    def invalidate_user(self, user_id: int) -> None:
+        self._user_cache_epoch += 1
+        self.user_cache.invalidate(user_id)
+
+    def on_user_block_changed(self, payload: str) -> None:
+        self.invalidate_user(int(payload))
+
+    def clear_user_cache(self) -> None:
+        self._user_cache_epoch += 1
+        self.user_cache.clear()
@@ -1,56 +1,81 @@
 from decimal import Decimal
+from typing import NoReturn
 
-from fastapi import Depends, HTTPException, status
+from fastapi import HTTPException, status
 
 from src.domain.entities import WishList
-from src.domain.errors import WishNotFoundError
+from src.domain.errors import WishNotFoundError, WishVersionMismatchError
 from src.domain.models import (
+    VersionedWishList,
     WishListCreate,
     WishListDetailed,
+    WishListPage,
     WishListUpdate,
     WishNoteCreate,
     WishNoteUpdate,
 )
 from src.infrastructure.persistence.wish_list import WishListStorage, WishNotesStorage
+from src.infrastructure.wish_list_cache import NullWishListCache, WishListCache
 
 
 class WishListService:
 
     def __init__(
         self,
-        wishes_storage: WishListStorage = Depends(),
-        notes_storage: WishNotesStorage = Depends(),
+        wishes_storage: WishListStorage,
+        notes_storage: WishNotesStorage,
+        cache: WishListCache | None = None,
     ):
         super().__init__()
         self._wishes_storage = wishes_storage
         self._notes_storage = notes_storage
+        self._cache = cache if cache is not None else NullWishListCache()
 
-    def get_all(self, maxPrice: Decimal | None = None) -> list[WishList]:
-        return self._wishes_storage.get_all(maxPrice)
+    async def get_all(self, maxPrice: Decimal | None = None) -> list[WishList]:
+        return await self._wishes_storage.get_all(maxPrice)
 
-    def get_all_by_user_id(self, user_id: int, maxPrice: Decimal | None = None) -> list[WishList]:
-        return self._wishes_storage.get_all_by_user_id(user_id, maxPrice)
-
-    def get_by_id(self, wish_id: int, user_id: int) -> WishListDetailed:
-        wish: WishList = self._wishes_storage.get_by_id(wish_id)
+    async def get_all_by_user_id(
+        self,
+        user_id: int,
+        maxPrice: Decimal | None = None,
+        cursor: int | None = None,
+        limit: int = 50,
+    ) -> WishListPage:
+        async def load() -> WishListPage:
+            # one extra row tells whether another page follows
+            rows = await self._wishes_storage.get_all_by_user_id(
+                user_id, maxPrice, cursor, limit + 1
+            )
+            items = rows[:limit]
+            next_cursor = items[-1].wish_list_id if len(rows) > limit else None
+            return WishListPage(items, next_cursor)
+
+        return await self._cache.get_page(user_id, (maxPrice, cursor, limit), load)
+
+    async def get_by_id(self, wish_id: int, user_id: int) -> WishListDetailed:
+        return (await self.get_versioned(wish_id, user_id)).wish
+
+    async def get_versioned(
+        self, wish_id: int, user_id: int, known_versions: list[int] | None = None
+    ) -> VersionedWishList:
+        """The wish with its version; .wish is None when the version is one
+        of known_versions (the caller's copy is current)."""
+        versioned = await self._cache.get_wish(
+            wish_id, lambda: self._wishes_storage.get_versioned(wish_id, user_id, known_versions)
+        )
+        # a cached wish may belong to someone else: the slow path below tells
+        if versioned is not None and (versioned.wish is None or versioned.wish.user_id == user_id):
+            if versioned.wish is not None and versioned.version in (known_versions or ()):
+                return VersionedWishList(versioned.version, None)
+            return versioned
+
+        # Miss: tell "not found" from "not yours"
+        wish = await self._wishes_storage.get_by_id(wish_id)
         if wish is None:
             raise WishNotFoundError(wish_id)
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="access denied")
 
-        # Check ownership
-        if wish.user_id != user_id:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="access denied")
-
-        detailed = WishListDetailed()
-        detailed.wish_list_id = wish.wish_list_id
-        detailed.user_id = wish.user_id
-        detailed.title = wish.title
-        detailed.description = wish.description
-        detailed.estimate_price = wish.estimate_price
-        detailed.link = wish.link
-        detailed.notes = self._notes_storage.get_all_by_wish_id(wish_id)
-        return detailed
-
-    def create(self, wish: WishListCreate, notes: list[WishNoteCreate]) -> int:
+    async def create(self, wish: WishListCreate, notes: list[WishNoteCreate]) -> int:
         wish.title = wish.title.strip()
         wish.description = wish.description.strip()
 
@@ -67,20 +92,19 @@ class WishListService:
             if len(note.title) == 0:
                 raise ValueError("note title must be filled")
 
-        wish_id = self._wishes_storage.create(wish)
-        for note in notes:
-            self._notes_storage.create(wish_id, note)
-
+        wish_id = await self._wishes_storage.create_with_notes(wish, notes)
+        await self._cache.invalidate(user_id=wish.user_id)
         return wish_id
 
-    def update(self, wish_id: int, wish: WishListUpdate, user_id: int) -> bool:
-        # Check ownership first
-        existing_wish = self._wishes_storage.get_by_id(wish_id)
-        if existing_wish is None:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="wish list not found")
-        if existing_wish.user_id != user_id:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="access denied")
-
+    async def update(
+        self,
+        wish_id: int,
+        wish: WishListUpdate,
+        user_id: int,
+        expected_versions: list[int] | None = None,
+    ) -> int:
+        """Returns the new version. With expected_versions, raises
+        WishVersionMismatchError unless the wish is at one of them."""
         wish.title = wish.title.strip()
         wish.description = wish.description.strip()
 
@@ -90,26 +114,28 @@ class WishListService:
         if wish.estimate_price < 0:
             raise ValueError("estimate price must be zero or greater")
 
-        return self._wishes_storage.update(wish_id, wish)
-
-    def delete(self, wish_id: int, user_id: int) -> bool:
-        # Check ownership first
-        existing_wish = self._wishes_storage.get_by_id(wish_id)
-        if existing_wish is None:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="wish list not found")
-        if existing_wish.user_id != user_id:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="access denied")
-
-        return self._wishes_storage.delete(wish_id)
-
-    def add_notes(self, wish_id: int, notes: list[WishNoteCreate], user_id: int) -> bool:
-        # Check ownership first
-        existing_wish = self._wishes_storage.get_by_id(wish_id)
-        if existing_wish is None:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="wish list not found")
-        if existing_wish.user_id != user_id:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="access denied")
-
+        version = await self._wishes_storage.update(wish_id, user_id, wish, expected_versions)
+        if version is None:
+            await self._not_matched(wish_id, user_id)
+        # list pages show title and price too
+        await self._cache.invalidate(wish_id, user_id)
+        return version
+
+    async def delete(self, wish_id: int, user_id: int) -> bool:
+        if await self._wishes_storage.delete(wish_id, user_id):
+            await self._cache.invalidate(wish_id, user_id)
+            return True
+        await self._check_owner(wish_id, user_id)
+        return False
+
+    async def add_notes(
+        self,
+        wish_id: int,
+        notes: list[WishNoteCreate],
+        user_id: int,
+        expected_versions: list[int] | None = None,
+    ) -> int:
+        """Returns the wish's new version; see update for expected_versions."""
         for note in notes:
             note.title = note.title.strip()
             note.description = note.description.strip()
@@ -117,19 +143,23 @@ class WishListService:
             if len(note.title) == 0:
                 raise ValueError("title must be filled")
 
-        for note in notes:
-            self._notes_storage.create(wish_id, note)
-
-        return True
-
-    def update_notes(self, wish_id: int, notes: list[WishNoteUpdate], user_id: int) -> bool:
-        # Check ownership first
-        existing_wish = self._wishes_storage.get_by_id(wish_id)
-        if existing_wish is None:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="wish list not found")
-        if existing_wish.user_id != user_id:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="access denied")
+        version, _ = await self._notes_storage.create_many(
+            wish_id, user_id, notes, expected_versions
+        )
+        if version is None:
+            await self._not_matched(wish_id, user_id)
+        # pages do not include notes
+        await self._cache.invalidate(wish_id)
+        return version
 
+    async def update_notes(
+        self,
+        wish_id: int,
+        notes: list[WishNoteUpdate],
+        user_id: int,
+        expected_versions: list[int] | None = None,
+    ) -> tuple[int, dict[int, bool]]:
+        """Returns the wish's new version and whether each note was updated."""
         for note in notes:
             note.title = note.title.strip()
             note.description = note.description.strip()
@@ -137,19 +167,43 @@ class WishListService:
             if len(note.title) == 0:
                 raise ValueError("title must be filled")
 
-        for note in notes:
-            self._notes_storage.update(note)
-
-        return True
+        version, updated = await self._notes_storage.update_many(
+            wish_id, user_id, notes, expected_versions
+        )
+        if version is None:
+            await self._not_matched(wish_id, user_id)
+        await self._cache.invalidate(wish_id)
+        return version, {note.wish_note_id: note.wish_note_id in updated for note in notes}
 
-    def delete_notes(self, wish_id: int, notes_id: list[int], user_id: int) -> bool:
-        # Check ownership first
-        existing_wish = self._wishes_storage.get_by_id(wish_id)
+    async def delete_notes(
+        self,
+        wish_id: int,
+        notes_id: list[int],
+        user_id: int,
+        expected_versions: list[int] | None = None,
+    ) -> tuple[int, dict[int, bool]]:
+        """Returns the wish's new version and whether each note was deleted."""
+        version, deleted = await self._notes_storage.delete_many(
+            wish_id, user_id, notes_id, expected_versions
+        )
+        if version is None:
+            await self._not_matched(wish_id, user_id)
+        await self._cache.invalidate(wish_id)
+        return version, {id: id in deleted for id in notes_id}
+
+    async def _not_matched(self, wish_id: int, user_id: int) -> NoReturn:
+        """A versioned write matched no wish: 404, 403, or else the version."""
+        await self._check_owner(wish_id, user_id)
+        raise WishVersionMismatchError(wish_id)
+
+    async def _check_owner(self, wish_id: int, user_id: int) -> None:
+        """Slow path for writes that matched no rows: raise 404 or 403.
+
+        Returns normally when the wish exists and belongs to user_id, i.e.
+        only the targeted rows (or the expected version) did not match.
+        """
+        existing_wish = await self._wishes_storage.get_by_id(wish_id)
         if existing_wish is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="wish list not found")
         if existing_wish.user_id != user_id:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="access denied")
-
-        for id in notes_id:
-            self._notes_storage.delete(id)
-        return True
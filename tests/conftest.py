@@ -1,7 +1,113 @@
 # tests/conftest.py
 import sys
+import uuid
+from decimal import Decimal
 from pathlib import Path
 
+import psycopg
+import pytest
+
 ROOT = Path(__file__).resolve().parents[1]  # корень репозитория
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+from src.domain.entities import WishNote  # noqa: E402
+from src.domain.models import (  # noqa: E402
+    VersionedWishList,
+    WishListCreate,
+    WishListDetailed,
+    WishListUpdate,
+    WishNoteCreate,
+    WishNoteUpdate,
+)
+from src.infrastructure.persistence import db  # noqa: E402
+
+
+class FakeClock:
+    """Monotonic clock that only moves when a test sets `now`."""
+
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+def wish_create(user_id: int, title: str = "bike") -> WishListCreate:
+    wish = WishListCreate()
+    wish.user_id = user_id
+    wish.title = title
+    wish.description = "red"
+    wish.estimate_price = Decimal("10")
+    return wish
+
+
+def wish_update(title: str = "bike") -> WishListUpdate:
+    wish = WishListUpdate()
+    wish.title = title
+    wish.description = "red"
+    wish.estimate_price = Decimal("10")
+    wish.link = None
+    return wish
+
+
+def note_create(title: str) -> WishNoteCreate:
+    note = WishNoteCreate()
+    note.title = title
+    note.description = ""
+    note.received = False
+    return note
+
+
+def note_update(note_id: int, title: str = "updated") -> WishNoteUpdate:
+    note = WishNoteUpdate()
+    note.wish_note_id = note_id
+    note.title = title
+    note.description = ""
+    note.received = True
+    return note
+
+
+def versioned_wish(wish_id: int, user_id: int, version: int = 1) -> VersionedWishList:
+    """A detailed wish with one note, as WishListStorage.get_versioned returns it."""
+    wish = WishListDetailed(
+        wish_id,
+        user_id,
+        "bike",
+        "red",
+        Decimal("10"),
+        None,
+        [WishNote(1, wish_id, "n", "", False)],
+    )
+    return VersionedWishList(version, wish)
+
+
+def database_available() -> bool:
+    """True when PostgreSQL answers with the DB_* settings."""
+    try:
+        with psycopg.connect(db.conninfo(), connect_timeout=2):
+            return True
+    except psycopg.OperationalError:
+        return False
+
+
+@pytest.fixture
+def postgres_schema(monkeypatch):
+    """Point every new connection at a throwaway schema (skips without PostgreSQL)."""
+    if not database_available():
+        pytest.skip("PostgreSQL is not reachable")
+    schema = f"test_{uuid.uuid4().hex[:8]}"
+    with psycopg.connect(db.conninfo(), autocommit=True) as conn:
+        conn.execute(f"CREATE SCHEMA {schema}")
+    # libpq applies PGOPTIONS to every connection, pooled or not
+    monkeypatch.setenv("PGOPTIONS", f"-c search_path={schema}")
+    try:
+        yield schema
+    finally:
+        with psycopg.connect(db.conninfo(), autocommit=True) as conn:
+            conn.execute(f"DROP SCHEMA {schema} CASCADE")
@@ -0,0 +1,98 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import jwt
+
+from src.domain.auth import User
+from src.infrastructure.settings import Settings
+from src.use_cases import auth
+from src.use_cases.auth import AuthService
+
+
+def _service() -> AuthService:
+    return AuthService(None, None, None, Settings(jwt_secret="test"))
+
+
+def _token(user_id: int, expires_in: float) -> str:
+    return jwt.encode({"sub": str(user_id), "exp": int(time.time() + expires_in)}, "test")
+
+
+def test_repeated_token_skips_signature_verification(monkeypatch):
+    service = _service()
+    token = _token(7, 600)
+    decoded = []
+    real_decode = jwt.decode
+    monkeypatch.setattr(
+        auth.jwt,
+        "decode",
+        lambda *args, **kwargs: decoded.append(1) or real_decode(*args, **kwargs),
+    )
+
+    assert [service.verify_token(token) for _ in range(3)] == [7, 7, 7]
+    assert len(decoded) == 1
+    assert service.token_cache.stats() == {"size": 1, "hits": 2, "misses": 1}
+
+
+def test_invalid_and_expired_tokens_are_rejected_and_not_cached():
+    service = _service()
+    forged = jwt.encode({"sub": "7", "exp": int(time.time() + 600)}, "other secret")
+
+    assert service.verify_token(forged) is None
+    assert service.verify_token(_token(7, -10)) is None
+    assert len(service.token_cache) == 0
+
+
+class FakeUsers:
+    def __init__(self, users: dict[int, User]) -> None:
+        self.users = users
+        self.lookups = 0
+
+    async def get_by_id(self, user_id: int) -> User | None:
+        self.lookups += 1
+        return self.users.get(user_id)
+
+    async def set_block_until(self, user_id: int, blocked_until) -> None:
+        self.users[user_id].blocked_until = blocked_until
+
+
+def test_block_status_is_cached_until_invalidated():
+    users = FakeUsers({1: User(user_id=1), 2: User(user_id=2)})
+    service = AuthService(users, None, None, Settings())
+
+    async def run() -> list[bool]:
+        seen = [await service.is_active(1) for _ in range(3)]
+        seen.append(await service.is_active(3))
+        await service.block_user_until(1, datetime.now(timezone.utc) + timedelta(minutes=5))
+        seen.append(await service.is_active(1))
+        users.users[2].blocked_until = datetime.now(timezone.utc) + timedelta(minutes=5)
+        service.on_user_block_changed("2")  # as delivered by NOTIFY
+        seen.append(await service.is_active(2))
+        return seen
+
+    assert asyncio.run(run()) == [True, True, True, False, False, False]
+    assert users.lookups == 4
+
+
+def test_lookup_racing_a_block_notification_is_not_cached():
+    users = FakeUsers({1: User(user_id=1)})
+    service = AuthService(users, None, None, Settings(jwt_secret="test"))
+    real_get_by_id = users.get_by_id
+
+    async def get_by_id_then_blocked(user_id):
+        user = await real_get_by_id(user_id)
+        # the block commits and is announced while the stale row is in flight
+        users.users[user_id] = User(
+            user_id=1, blocked_until=datetime.now(timezone.utc) + timedelta(minutes=5)
+        )
+        service.on_user_block_changed(str(user_id))
+        return user
+
+    users.get_by_id = get_by_id_then_blocked
+
+    async def run():
+        first = await service.is_active(1)
+        users.get_by_id = real_get_by_id
+        return first, await service.is_active(1)
+
+    assert asyncio.run(run()) == (True, False)
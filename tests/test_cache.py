@@ -0,0 +1,44 @@
+from src.infrastructure.cache import TTLCache
+
+
+def test_entries_expire_after_their_ttl(clock):
+    cache: TTLCache[str, int] = TTLCache(10, clock=clock)
+    cache.set("short", 1, ttl=5)
+    cache.set("long", 2, ttl=50)
+
+    clock.now += 10
+
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 1}
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache: TTLCache[str, int] = TTLCache(2, clock=clock)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.get("a")
+    cache.set("c", 3, ttl=60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_already_expired_values_are_not_stored(clock):
+    cache: TTLCache[str, int] = TTLCache(2, clock=clock)
+    cache.set("a", 1, ttl=0)
+
+    assert len(cache) == 0
+
+
+def test_weighed_entries_share_the_budget(clock):
+    cache: TTLCache[str, list[int]] = TTLCache(5, clock=clock, weigh=len)
+    cache.set("a", [1, 2], ttl=60)
+    cache.set("b", [1, 2, 3], ttl=60)
+    cache.set("c", [1], ttl=60)
+    cache.set("huge", list(range(6)), ttl=60)
+
+    assert cache.get("a") is None
+    assert cache.get("huge") is None
+    assert cache.weight == 4 and len(cache) == 2
@@ -0,0 +1,108 @@
+import gzip
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from src.presentation.middleware.compression import (
+    CompressionMiddleware,
+    CompressionStats,
+    negotiate,
+)
+from src.presentation.problems import ProblemType
+
+ITEMS = [{"id": i, "title": f"wish {i}", "description": "the same words again"} for i in range(200)]
+
+
+def _client(stats: CompressionStats) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500, stats=stats)
+
+    @app.get("/items/{count}")
+    async def items(count: int):
+        return JSONResponse(ITEMS[:count], headers={"ETag": 'W/"v1"'})
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for item in ITEMS:
+                yield f"{item}\n".encode()
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/problem")
+    async def problem():
+        return ProblemType("about:blank", "Big", 400).response("x" * 5000)
+
+    return TestClient(app)
+
+
+def test_negotiate_picks_accepted_coding():
+    assert negotiate("gzip, deflate", brotli_available=True) == "gzip"
+    assert negotiate("gzip;q=0.5, br", brotli_available=True) == "br"
+    assert negotiate("gzip, br", brotli_available=False) == "gzip"
+    assert negotiate("br;q=0.2, gzip;q=0.8", brotli_available=True) == "gzip"
+    assert negotiate("gzip;q=0, identity") is None
+    assert negotiate("*", brotli_available=False) == "gzip"
+    assert negotiate("gzip;q=0, *", brotli_available=False) is None
+    assert negotiate("br;q=0, *", brotli_available=True) == "gzip"
+    assert negotiate("br;q=0, gzip;q=0, *", brotli_available=True) is None
+
+
+def test_large_json_is_gzipped_and_small_is_not():
+    stats = CompressionStats()
+    client = _client(stats)
+
+    large = client.get("/items/200", headers={"Accept-Encoding": "gzip"})
+    small = client.get("/items/2", headers={"Accept-Encoding": "gzip"})
+
+    assert large.headers["content-encoding"] == "gzip"
+    assert large.headers["vary"] == "Accept-Encoding"
+    assert large.headers["etag"] == small.headers["etag"] == 'W/"v1"'
+    assert large.json() == ITEMS
+    assert "content-encoding" not in small.headers
+    route = stats.stats()["/items/{count}"]
+    assert route["responses"] == 1
+    assert route["bytes_in"] == len(large.content)
+    assert route["bytes_out"] == int(large.headers["content-length"])
+    assert route["bytes_saved"] > route["bytes_out"]
+
+
+def test_identity_when_not_accepted():
+    response = _client(CompressionStats()).get("/items/200", headers={"Accept-Encoding": ""})
+
+    assert "content-encoding" not in response.headers
+    assert response.json() == ITEMS
+
+
+def test_streamed_body_is_compressed_chunk_by_chunk():
+    stats = CompressionStats()
+    response = _client(stats).get("/stream", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    expected = "".join(f"{item}\n" for item in ITEMS)
+    assert response.text == expected
+    assert stats.stats()["/stream"]["bytes_in"] == len(expected.encode())
+
+
+def test_problem_documents_are_not_compressed():
+    response = _client(CompressionStats()).get("/problem", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-type"] == "application/problem+json"
+    assert "content-encoding" not in response.headers
+
+
+def test_gzip_body_is_valid_gzip():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=0)
+
+    @app.get("/")
+    async def root():
+        return ITEMS
+
+    client = TestClient(app)
+    with client.stream("GET", "/", headers={"Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+
+    assert gzip.decompress(raw) == client.get("/", headers={"Accept-Encoding": ""}).content
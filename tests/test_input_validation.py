@@ -5,6 +5,7 @@ from src.presentation.validators.input_validators import (
     sanitize_html_content,
     validate_email,
     validate_file_path,
+    validate_many,
     validate_numeric_range,
     validate_text_content,
     validate_url,
@@ -133,3 +134,27 @@ def test_sanitize_html_content():
     malicious_html = '<div onclick="alert(1)">Click me</div>'
     result = sanitize_html_content(malicious_html)
     assert "onclick=" not in result
+
+
+def test_validate_many_matches_validate_text_content():
+    texts = ["  Bike ", "<b>red</b>", "Android or iOS", "and 3 more"]
+
+    assert validate_many(texts, "title") == [validate_text_content(text, "title") for text in texts]
+
+
+def test_validate_many_reports_offending_item():
+    with pytest.raises(InputValidationError, match=r"title\[2\] contains potentially malicious"):
+        validate_many(["fine", "also fine", "1 OR 1=1"], "title")
+
+    with pytest.raises(InputValidationError, match=r"title\[1\] cannot be empty"):
+        validate_many(["fine", "   "], "title")
+
+
+def test_validate_many_does_not_match_across_items():
+    # "... or" + "1=1 ..." and "-" + "-" only look suspicious when concatenated
+    assert validate_many(["this or", "1=1 is fine", "a-", "-b"], "title") == [
+        "this or",
+        "1=1 is fine",
+        "a-",
+        "-b",
+    ]
@@ -0,0 +1,26 @@
+from fastapi.testclient import TestClient
+
+from src.app.main import app
+
+client = TestClient(app, client=("127.0.0.1", 50000))
+
+
+def test_metrics_exposes_db_pool_section():
+    r = client.get("/api/metrics")
+    assert r.status_code == 200
+    assert "db_pool" in r.json()
+
+
+def test_metrics_exposes_password_hasher_section():
+    r = client.get("/api/metrics")
+    assert {"queue_depth", "latency_avg_ms", "rejected"} <= r.json()["password_hasher"].keys()
+
+
+def test_metrics_exposes_compression_section():
+    r = client.get("/api/metrics")
+    assert isinstance(r.json()["compression"], dict)
+
+
+def test_metrics_are_hidden_from_other_hosts():
+    r = TestClient(app, client=("203.0.113.7", 50000)).get("/api/metrics")
+    assert r.status_code == 403
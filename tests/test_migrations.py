@@ -0,0 +1,7 @@
+from src.infrastructure.persistence.migrations import MIGRATIONS
+
+
+def test_migration_versions_are_unique_and_ordered():
+    versions = [version for version, _, _ in MIGRATIONS]
+    assert versions == sorted(set(versions))
+    assert versions[0] == 1
@@ -0,0 +1,38 @@
+import asyncio
+from datetime import datetime, timezone
+
+from src.infrastructure.persistence import db, migrations
+from src.infrastructure.persistence.auth import UsersRepository
+from src.infrastructure.persistence.notifications import USER_BLOCK_CHANNEL, NotificationListener
+
+
+def test_set_block_until_notifies_listeners(postgres_schema):
+    users = UsersRepository()
+    received: list[str] = []
+    resets: list[bool] = []
+    listener = NotificationListener(
+        USER_BLOCK_CHANNEL, received.append, lambda: resets.append(True)
+    )
+
+    async def run() -> int:
+        try:
+            await migrations.run_migrations()
+            user_id = await users.create("blocked@example.com", "x")
+            await listener.start()
+            await asyncio.wait_for(listener.wait_listening(), 5)
+            await users.set_block_until(user_id, datetime.now(timezone.utc))
+            await users.set_block_until(user_id + 1, None)  # no such user: no notification
+            for _ in range(50):
+                if received:
+                    break
+                await asyncio.sleep(0.05)
+            await asyncio.sleep(0.1)
+            return user_id
+        finally:
+            await listener.stop()
+            await db.close_pool()
+
+    user_id = asyncio.run(run())
+
+    assert resets == [True]
+    assert received == [str(user_id)]
@@ -0,0 +1,76 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from fastapi import Request
+
+from src.domain.errors import ServiceOverloadedError
+from src.infrastructure.password_hasher import PasswordHasher
+from src.presentation.handlers.exceptions import service_overloaded_handler
+
+
+class BlockingContext:
+    """CryptContext stand-in whose operations wait for `release`."""
+
+    def __init__(self) -> None:
+        self.release = threading.Event()
+
+    def hash(self, password: str) -> str:
+        self.release.wait(5)
+        return f"hashed:{password}"
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        self.release.wait(5)
+        return password_hash == f"hashed:{password}"
+
+
+def test_hash_and_verify_run_in_the_pool():
+    hasher = PasswordHasher(max_workers=1, max_queue=0)
+
+    async def run():
+        password_hash = await hasher.hash("secret")
+        return await hasher.verify("secret", password_hash), await hasher.verify("x", password_hash)
+
+    try:
+        assert asyncio.run(run()) == (True, False)
+        stats = hasher.stats()
+        assert stats["completed"] == 3
+        assert stats["latency_avg_ms"] > 0
+    finally:
+        hasher.close()
+
+
+def test_rejects_when_workers_and_queue_are_full():
+    context = BlockingContext()
+    hasher = PasswordHasher(max_workers=1, max_queue=1, context=context)
+
+    async def run():
+        admitted = [asyncio.ensure_future(hasher.hash(str(i))) for i in range(2)]
+        await asyncio.sleep(0)
+        assert hasher.stats()["queue_depth"] == 1
+        with pytest.raises(ServiceOverloadedError) as overloaded:
+            await hasher.hash("one too many")
+        context.release.set()
+        return overloaded.value, await asyncio.gather(*admitted)
+
+    try:
+        error, hashes = asyncio.run(run())
+        assert error.retry_after >= 1
+        assert hashes == ["hashed:0", "hashed:1"]
+        assert hasher.stats()["rejected"] == 1
+    finally:
+        hasher.close()
+
+
+def test_overload_is_reported_as_503_problem():
+    request = Request({"type": "http", "method": "POST", "path": "/api/auth/login", "headers": []})
+
+    response = asyncio.run(
+        service_overloaded_handler(request, ServiceOverloadedError("password hashing", 3))
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
+    assert response.headers["content-type"] == "application/problem+json"
+    assert json.loads(response.body)["title"] == "Service Overloaded"
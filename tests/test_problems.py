@@ -0,0 +1,60 @@
+import json
+import uuid
+
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from src.app.main import app
+from src.presentation.models.rfc7807 import ProblemDetail
+from src.presentation.problems import MASKED_DETAIL, ProblemType, new_correlation_id
+
+TYPE = "https://wishlist.example.com/problems/validation-error"
+
+
+def _reference_body(body: bytes, detail: str, instance: str | None) -> bytes:
+    # what the handlers used to send, with the correlation id taken from body
+    problem = ProblemDetail(
+        type=TYPE,
+        title="Validation Error",
+        status=422,
+        detail=detail,
+        instance=instance,
+        correlation_id=json.loads(body)["correlation_id"],
+    )
+    return JSONResponse(problem.model_dump(exclude_none=True)).body
+
+
+def test_rendered_problem_matches_pydantic_encoding():
+    problem = ProblemType(TYPE, "Validation Error", 422)
+
+    for detail in ("body -> email: field required", 'кавычки "и" \\ \n\t\x01   ☃'):
+        for instance in ('http://testserver/api/wishes?q="x"', None):
+            body = problem.render(detail, instance)
+            assert body == _reference_body(body, detail, instance)
+
+
+def test_masked_problem_hides_type_and_detail():
+    body = json.loads(ProblemType(TYPE, "Validation Error", 400, mask=True).render("secret"))
+
+    assert body["type"] == "about:blank"
+    assert body["detail"] == MASKED_DETAIL
+    assert body["title"] == "Validation Error"
+
+
+def test_correlation_ids_are_unique_uuids():
+    ids = {new_correlation_id() for _ in range(1000)}
+
+    assert len(ids) == 1000
+    assert all(uuid.UUID(value).version == 4 for value in ids)
+
+
+def test_error_handlers_send_problem_json():
+    response = TestClient(app).post("/api/auth/register", json={"email": "a@example.com"})
+
+    assert response.status_code == 422
+    assert response.headers["content-type"] == "application/problem+json"
+    assert int(response.headers["content-length"]) == len(response.content)
+    problem = response.json()
+    assert list(problem) == ["type", "title", "status", "detail", "correlation_id", "instance"]
+    assert problem["status"] == 422
+    assert "password" in problem["detail"]
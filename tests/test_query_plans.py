@@ -0,0 +1,196 @@
+"""EXPLAIN every repository query against a seeded database.
+
+Fails when a request-path query falls back to a sequential scan of one of
+the application tables. Runs in a throwaway schema and is skipped when
+PostgreSQL is not reachable with the DB_* settings.
+"""
+
+import asyncio
+import hashlib
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import psycopg
+import pytest
+from conftest import database_available, note_create, note_update, wish_create, wish_update
+
+from src.infrastructure.persistence import auth, db, migrations, wish_list
+from src.infrastructure.persistence.auth import RefreshTokensRepository, UsersRepository
+from src.infrastructure.persistence.wish_list import WishListStorage, WishNotesStorage
+
+TABLES = {"users", "wish_lists", "wish_notes", "refresh_tokens"}
+USERS = 1000
+WISHES = 20000
+NOTES_PER_WISH = 3
+
+
+pytestmark = pytest.mark.skipif(not database_available(), reason="PostgreSQL is not reachable")
+
+
+@pytest.fixture(scope="module", autouse=True)
+def seeded_schema():
+    schema = f"plan_test_{uuid.uuid4().hex[:8]}"
+    with psycopg.connect(db.conninfo(), autocommit=True) as conn:
+        conn.execute(f"CREATE SCHEMA {schema}")
+    with pytest.MonkeyPatch.context() as mp:
+        # libpq applies PGOPTIONS to every pooled connection
+        mp.setenv("PGOPTIONS", f"-c search_path={schema}")
+        asyncio.run(_migrate())
+        with psycopg.connect(db.conninfo(), autocommit=True) as conn:
+            conn.execute(
+                """
+                INSERT INTO users (email, password_hash)
+                SELECT 'user' || g || '@example.com', 'x' FROM generate_series(1, %s) g
+                """,
+                (USERS,),
+            )
+            conn.execute(
+                """
+                INSERT INTO wish_lists (user_id, title, description, estimate_price)
+                SELECT g %% %s + 1, 'wish ' || g, 'description', g %% 500
+                FROM generate_series(1, %s) g
+                """,
+                (USERS, WISHES),
+            )
+            conn.execute(
+                """
+                INSERT INTO wish_notes (wish_list_id, title, description, received)
+                SELECT w.wish_list_id, 'note ' || n, 'description', n %% 2 = 0
+                FROM wish_lists w, generate_series(1, %s) n
+                """,
+                (NOTES_PER_WISH,),
+            )
+            conn.execute(
+                """
+                INSERT INTO refresh_tokens (user_id, family_id, token_hash, expires_at)
+                SELECT g %% %s + 1, gen_random_uuid(), sha256(g::text::bytea), now() + '1 day'
+                FROM generate_series(1, %s) g
+                """,
+                (USERS, WISHES),
+            )
+            conn.execute("ANALYZE")
+        yield
+    with psycopg.connect(db.conninfo(), autocommit=True) as conn:
+        conn.execute(f"DROP SCHEMA {schema} CASCADE")
+
+
+async def _migrate() -> None:
+    try:
+        await migrations.run_migrations()
+    finally:
+        await db.close_pool()
+
+
+class _ExplainingCursor:
+    """Cursor proxy that records the plan of each statement before running it."""
+
+    def __init__(self, conn, cur, plans: list) -> None:
+        self._conn = conn
+        self._cur = cur
+        self._plans = plans
+
+    async def __aenter__(self):
+        await self._cur.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return await self._cur.__aexit__(*exc_info)
+
+    async def execute(self, query, params=None):
+        # separate cursor: the proxied one may carry an entity row factory
+        async with self._conn.cursor() as explain:
+            await explain.execute(f"EXPLAIN (FORMAT JSON) {query}", params)
+            self._plans.append((query, (await explain.fetchone())[0][0]["Plan"]))
+        return await self._cur.execute(query, params)
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+
+class _ExplainingConnection:
+    def __init__(self, conn, plans: list) -> None:
+        self._conn = conn
+        self._plans = plans
+
+    def cursor(self, *args, **kwargs):
+        return _ExplainingCursor(self._conn, self._conn.cursor(*args, **kwargs), self._plans)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def _seq_scans(plan: dict) -> list[str]:
+    found = []
+    if plan["Node Type"] == "Seq Scan" and plan.get("Relation Name") in TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(_seq_scans(child))
+    return found
+
+
+users, wishes, notes = UsersRepository(), WishListStorage(), WishNotesStorage()
+refresh_tokens = RefreshTokensRepository()
+
+# wish 2 belongs to user 3 (user_id = wish_list_id % USERS + 1); notes 4..6 belong to wish 2
+CASES = {
+    "users.get_by_email": lambda: users.get_by_email("user42@example.com"),
+    "users.get_by_id": lambda: users.get_by_id(42),
+    "users.create": lambda: users.create("new@example.com", "x"),
+    "users.set_block_until": lambda: users.set_block_until(42, None),
+    "users.record_failed_login": lambda: users.record_failed_login(42, 5, timedelta(minutes=10)),
+    "users.record_successful_login": lambda: users.record_successful_login(42),
+    "refresh_tokens.create": lambda: refresh_tokens.create(
+        42, uuid.uuid4(), b"new", datetime.now(timezone.utc)
+    ),
+    "refresh_tokens.rotate": lambda: refresh_tokens.rotate(
+        hashlib.sha256(b"42").digest(), b"rotated", datetime.now(timezone.utc)
+    ),
+    "refresh_tokens.revoke_family": lambda: refresh_tokens.revoke_family(
+        hashlib.sha256(b"43").digest(), only_if_used=True
+    ),
+    "refresh_tokens.purge_expired": lambda: refresh_tokens.purge_expired(),
+    "wishes.get_all_by_user_id": lambda: wishes.get_all_by_user_id(3),
+    "wishes.get_all_by_user_id.price": lambda: wishes.get_all_by_user_id(3, Decimal("100")),
+    "wishes.get_all_by_user_id.page": lambda: wishes.get_all_by_user_id(3, None, 5000, 21),
+    "wishes.get_by_id": lambda: wishes.get_by_id(2),
+    "wishes.get_detailed": lambda: wishes.get_detailed(2, 3),
+    "wishes.get_versioned.not_modified": lambda: wishes.get_versioned(2, 3, [1]),
+    "wishes.create_with_notes": lambda: wishes.create_with_notes(
+        wish_create(3), [note_create("a"), note_create("b")]
+    ),
+    "wishes.update": lambda: wishes.update(2, 3, wish_update()),
+    "wishes.update.if_match": lambda: wishes.update(2, 3, wish_update(), [2]),
+    "wishes.delete": lambda: wishes.delete(1002, 3),
+    "notes.get_all_by_wish_id": lambda: notes.get_all_by_wish_id(2),
+    "notes.get_by_id": lambda: notes.get_by_id(4),
+    "notes.create_many": lambda: notes.create_many(2, 3, [note_create("c")]),
+    "notes.update_many": lambda: notes.update_many(2, 3, [note_update(4), note_update(5)]),
+    "notes.delete_many": lambda: notes.delete_many(2, 3, [6, 7]),
+}
+
+
+@pytest.mark.parametrize("name", CASES)
+def test_query_plan_avoids_seq_scan(name, monkeypatch):
+    plans: list = []
+
+    @asynccontextmanager
+    async def explaining_connection():
+        async with db.connection() as conn:
+            yield _ExplainingConnection(conn, plans)
+
+    monkeypatch.setattr(wish_list, "connection", explaining_connection)
+    monkeypatch.setattr(auth, "connection", explaining_connection)
+
+    async def run() -> None:
+        try:
+            await CASES[name]()
+        finally:
+            await db.close_pool()
+
+    asyncio.run(run())
+
+    assert plans, f"{name} executed no statements"
+    for query, plan in plans:
+        assert _seq_scans(plan) == [], f"{name} scans sequentially:\n{query}"
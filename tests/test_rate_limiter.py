@@ -0,0 +1,132 @@
+import asyncio
+
+from conftest import FakeClock
+
+from src.infrastructure.persistence import db, migrations
+from src.infrastructure.rate_limit.base import Limit, RateLimitDecision
+from src.infrastructure.rate_limit.memory import InMemoryRateLimiter
+from src.infrastructure.rate_limit.postgres import PostgresRateLimiter
+from src.infrastructure.rate_limit.shared_memory import SharedMemoryRateLimiter
+
+
+def _limiter(clock: FakeClock, max_keys: int = 100) -> InMemoryRateLimiter:
+    return InMemoryRateLimiter(
+        {"rate": Limit(100, 60), "burst": Limit(50, 10)}, max_keys=max_keys, clock=clock
+    )
+
+
+def test_burst_limit_allows_exactly_burst_back_to_back(clock):
+    limiter = _limiter(clock)
+
+    assert all(limiter.try_acquire("a").allowed for _ in range(50))
+    decision = limiter.try_acquire("a")
+
+    assert not decision.allowed
+    assert decision.exceeded == "burst"
+    assert 0 < decision.retry_after <= 0.2 + 1e-6
+    assert limiter.try_acquire("b").allowed
+
+
+def test_sustained_limit_applies_after_bursts(clock):
+    limiter = _limiter(clock)
+
+    allowed = 0
+    for _ in range(600):  # 50 per 10 s alone would allow 3000 in 10 minutes
+        clock.now += 1
+        for _ in range(50):
+            allowed += limiter.try_acquire("a").allowed
+
+    # a full bucket of 100, then one request every 0.6 s
+    assert allowed <= 100 + 600 / 0.6 + 1
+    assert limiter.try_acquire("a").exceeded == "rate"
+
+
+def test_rejected_request_does_not_consume_tokens(clock):
+    limiter = _limiter(clock)
+    for _ in range(50):
+        limiter.try_acquire("a")
+    for _ in range(1000):
+        limiter.try_acquire("a")
+
+    clock.now += 0.2
+
+    assert limiter.try_acquire("a").allowed
+
+
+def test_idle_keys_are_evicted(clock):
+    limiter = _limiter(clock)
+    for ip in range(10):
+        limiter.try_acquire(f"10.0.0.{ip}")
+
+    clock.now += 61
+    limiter.try_acquire("10.0.1.1")
+
+    assert len(limiter) == 1
+
+
+def test_number_of_keys_is_capped(clock):
+    limiter = _limiter(clock, max_keys=3)
+    for ip in range(10):
+        limiter.try_acquire(f"10.0.0.{ip}")
+
+    assert len(limiter) == 3
+
+
+def test_shared_memory_state_is_shared_between_workers(tmp_path, clock):
+    path = str(tmp_path / "rate-limit")
+    limits = {"rate": Limit(100, 60), "burst": Limit(50, 10)}
+    worker_a = SharedMemoryRateLimiter(path, limits, capacity=64, clock=clock)
+    worker_b = SharedMemoryRateLimiter(path, limits, capacity=64, clock=clock)
+
+    for _ in range(25):
+        assert worker_a.try_acquire("a").allowed
+        assert worker_b.try_acquire("a").allowed
+
+    assert worker_a.try_acquire("a").exceeded == "burst"
+    assert worker_b.try_acquire("a").exceeded == "burst"
+    assert worker_b.try_acquire("b").allowed
+
+
+def test_shared_memory_table_is_bounded(tmp_path, clock):
+    limits = {"burst": Limit(1, 10)}
+    limiter = SharedMemoryRateLimiter(str(tmp_path / "rl"), limits, capacity=4, clock=clock)
+
+    for ip in range(100):
+        assert limiter.try_acquire(f"10.0.0.{ip}").allowed
+
+    assert (tmp_path / "rl").stat().st_size == 16 + 4 * 16
+
+
+def test_postgres_leases_are_shared_between_nodes(postgres_schema):
+    limits = {"burst": Limit(4, 10)}  # leases of up to 2
+    node_a, node_b = PostgresRateLimiter(limits), PostgresRateLimiter(limits)
+
+    async def run() -> list[RateLimitDecision]:
+        try:
+            await migrations.run_migrations()
+            return [
+                await node_a.acquire("a"),  # leases 1
+                await node_a.acquire("a"),  # used up in time: leases 2, keeps 1 locally
+                await node_b.acquire("a"),  # leases the last one
+                await node_b.acquire("a"),  # nothing left in the table
+                await node_a.acquire("a"),  # served from the local lease
+                await node_a.acquire("a"),
+            ]
+        finally:
+            await db.close_pool()
+
+    decisions = asyncio.run(run())
+
+    assert [d.allowed for d in decisions] == [True, True, True, False, True, False]
+    assert decisions[3].exceeded == "burst"
+    assert 0 < decisions[3].retry_after <= 10 / 4
+
+
+def test_postgres_lease_size_is_capped_by_the_burst():
+    limits = {"rate": Limit(100, 60), "burst": Limit(50, 10)}
+
+    # what idle clients can strand stays within a quarter of the burst
+    assert PostgresRateLimiter(limits)._max_lease == 13
+    assert PostgresRateLimiter(limits, processes=4)._max_lease == 4
+    assert PostgresRateLimiter(limits, processes=100)._max_lease == 1
+    assert PostgresRateLimiter(limits, max_lease=2)._max_lease == 2
@@ -0,0 +1,35 @@
+import json
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+
+from src.app.main import app
+from src.domain.entities import WishList, WishNote
+from src.domain.models import WishListDetailed, WishListPage
+from src.presentation.responses import FastJSONResponse
+
+
+def test_fast_response_matches_default_encoding():
+    page = WishListPage(
+        [
+            WishList(1, 2, "Велосипед", "красный", Decimal("10.50"), None),
+            WishList(3, 2, "Book", "any", Decimal("11"), "https://example.com"),
+        ],
+        3,
+    )
+    detailed = WishListDetailed(
+        1, 2, "Bike", "d", Decimal("0.1"), None, [WishNote(4, 1, "n", "d", True)]
+    )
+
+    for content in (page, detailed, {"success": True}):
+        body = FastJSONResponse(content).body
+        assert json.loads(body) == jsonable_encoder(content)
+    assert b"\xd0\x92" in FastJSONResponse(page).body  # UTF-8, not \u escapes
+
+
+def test_wish_routes_document_their_response_models():
+    schema = TestClient(app).get("/openapi.json").json()
+    ok = schema["paths"]["/api/wishes"]["get"]["responses"]["200"]
+
+    assert ok["content"]["application/json"]["schema"]["$ref"].endswith("WishListPageResponse")
@@ -1,7 +1,19 @@
 import pytest
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
+from src import presentation
+from src.app.container import Container
 from src.app.main import app
+from src.infrastructure.rate_limit.base import Limit
+from src.infrastructure.rate_limit.memory import InMemoryRateLimiter
+from src.infrastructure.settings import Settings
+from src.presentation.handlers.middleware import RequestSizeLimitMiddleware
+from src.presentation.middleware import auth as auth_middleware
+from src.presentation.middleware.security_middleware import (
+    RateLimitMiddleware,
+    SecurityHeadersMiddleware,
+)
 
 # Create separate clients for different test scenarios
 client = TestClient(app)
@@ -100,3 +112,55 @@ def test_csp_header():
     assert "default-src 'self'" in csp
     assert "script-src 'self' 'unsafe-inline'" in csp
     assert "style-src 'self' 'unsafe-inline'" in csp
+
+
+def _stacked_app(burst_limit: int = 50) -> FastAPI:
+    stacked = FastAPI()
+
+    @stacked.post("/echo")
+    async def echo():
+        return {"ok": True}
+
+    stacked.add_middleware(RateLimitMiddleware, requests_per_minute=100, burst_limit=burst_limit)
+    stacked.add_middleware(SecurityHeadersMiddleware)
+    stacked.add_middleware(RequestSizeLimitMiddleware, max_body_size=10)
+    return stacked
+
+
+def test_rate_limited_response_is_problem_json_with_security_headers():
+    limited = TestClient(_stacked_app(burst_limit=1))
+
+    assert limited.post("/echo").status_code == 200
+    response = limited.post("/echo")
+
+    assert response.status_code == 429
+    assert response.headers["content-type"] == "application/problem+json"
+    assert response.json()["title"] == "Burst Limit Exceeded"
+    assert response.headers["X-Frame-Options"] == "DENY"
+
+
+def test_oversized_request_is_rejected():
+    response = TestClient(_stacked_app()).post("/echo", content=b"x" * 11)
+
+    assert response.status_code == 413
+    assert response.text == "Request payload too large"
+
+
+def test_rate_limit_middleware_uses_the_given_limiter():
+    limiter = InMemoryRateLimiter({"burst": Limit(1, 10)})  # empty, hence falsy
+
+    assert RateLimitMiddleware(app, limiter=limiter)._limiter is limiter
+
+
+def test_auth_rejections_pass_through_the_security_stack(monkeypatch):
+    container = Container(Settings(jwt_secret="test", auth_middleware_enabled=True))
+    monkeypatch.setattr(presentation, "get_container", lambda: container)
+    monkeypatch.setattr(auth_middleware, "get_container", lambda: container)
+    secured = FastAPI()
+    presentation.add_presentaion(secured)
+
+    response = TestClient(secured).get("/api/wishes")
+
+    assert response.status_code == 401
+    assert "Strict-Transport-Security" in response.headers
+    assert "Content-Security-Policy" in response.headers
@@ -0,0 +1,60 @@
+import subprocess
+import sys
+
+import jwt
+from conftest import ROOT
+
+from src.app.container import Container
+from src.infrastructure.settings import Settings
+
+
+def test_settings_read_from_environment(monkeypatch):
+    monkeypatch.setenv("DB_POOL_MAX_SIZE", "25")
+    monkeypatch.setenv("DB_MIGRATE_ON_STARTUP", "false")
+    monkeypatch.setenv("JWT_EXP_MINUTES", "5")
+    monkeypatch.setenv("METRICS_ALLOWED_HOSTS", "10.0.0.1, 10.0.0.2")
+
+    settings = Settings.from_env()
+
+    assert settings.db_pool_max_size == 25
+    assert settings.db_migrate_on_startup is False
+    assert settings.jwt_exp_minutes == 5
+    assert settings.metrics_allowed_hosts == ("10.0.0.1", "10.0.0.2")
+
+
+def test_settings_defaults_when_unset(monkeypatch):
+    monkeypatch.delenv("DB_MIGRATE_ON_STARTUP", raising=False)
+    monkeypatch.delenv("JWT_ALGO", raising=False)
+
+    settings = Settings.from_env()
+
+    assert settings.db_migrate_on_startup is True
+    assert settings.jwt_algo == "HS256"
+
+
+def test_container_shares_services():
+    container = Container(Settings(jwt_secret="test"))
+
+    assert container.auth_service._users is container.users_repository
+    assert container.wish_list_service._wishes_storage is container.wish_list_storage
+    token = jwt.encode({"sub": "7"}, "test", algorithm="HS256")
+    assert container.auth_service.verify_token(token) == 7
+
+
+def test_app_reads_dotenv_before_settings():
+    # stands in for a .env file: whatever load_dotenv sets must reach the settings
+    script = """
+import os, dotenv
+dotenv.load_dotenv = lambda *a, **k: os.environ.update(
+    JWT_SECRET="from-dotenv", ENVIRONMENT="production"
+) or True
+import src.app.main
+from src.infrastructure.settings import get_settings
+from src.presentation.handlers import exceptions
+print(get_settings().jwt_secret, get_settings().environment, exceptions._http_error(401)._mask)
+"""
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.split() == ["from-dotenv", "production", "True"]
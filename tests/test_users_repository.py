@@ -0,0 +1,88 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from src.infrastructure.persistence import db, migrations
+from src.infrastructure.persistence.auth import RefreshTokensRepository, UsersRepository
+
+
+def test_register_conflict_and_concurrent_failed_logins(postgres_schema):
+    users = UsersRepository()
+
+    async def run():
+        try:
+            await migrations.run_migrations()
+            user_id = await users.create("user@example.com", "x")
+            duplicate = await users.create("user@example.com", "y")
+            blocked = await asyncio.gather(
+                *(users.record_failed_login(user_id, 5, timedelta(minutes=10)) for _ in range(12))
+            )
+            after_failures = await users.get_by_id(user_id)
+            await users.record_successful_login(user_id)
+            return duplicate, blocked, after_failures, await users.get_by_id(user_id)
+        finally:
+            await db.close_pool()
+
+    duplicate, blocked, after_failures, after_success = asyncio.run(run())
+
+    assert duplicate is None
+    # the 5th and the 10th failure block, whatever the interleaving
+    assert blocked.count(True) == 2
+    assert after_failures.failed_attempts == 2
+    assert after_failures.blocked_until is not None
+    assert after_success.failed_attempts == 0
+    assert after_success.blocked_until is None
+
+
+def test_refresh_token_rotation_and_reuse_detection(postgres_schema):
+    tokens = RefreshTokensRepository()
+    users = UsersRepository()
+    expires = datetime.now(timezone.utc) + timedelta(days=1)
+
+    async def run():
+        try:
+            await migrations.run_migrations()
+            user_id = await users.create("user@example.com", "x")
+            await tokens.create(user_id, uuid.uuid4(), b"first", expires)
+            rotated = await tokens.rotate(b"first", b"second", expires)
+            replayed = await tokens.rotate(b"first", b"third", expires)
+            revoked = await tokens.revoke_family(b"first", only_if_used=True)
+            after_revocation = await tokens.rotate(b"second", b"fourth", expires)
+            return user_id, rotated, replayed, revoked, after_revocation
+        finally:
+            await db.close_pool()
+
+    user_id, rotated, replayed, revoked, after_revocation = asyncio.run(run())
+
+    assert rotated == (user_id, "user@example.com")
+    assert replayed is None
+    # replaying the used token revoked the token it was rotated into
+    assert revoked is True
+    assert after_revocation is None
+
+
+def test_expired_refresh_tokens_are_purged(postgres_schema):
+    tokens = RefreshTokensRepository(purge_interval=0)
+    users = UsersRepository()
+    now = datetime.now(timezone.utc)
+
+    async def run():
+        try:
+            await migrations.run_migrations()
+            user_id = await users.create("user@example.com", "x")
+            await tokens.create(user_id, uuid.uuid4(), b"expired", now - timedelta(seconds=1))
+            await tokens.create(user_id, uuid.uuid4(), b"live", now + timedelta(days=1))
+            # with purge_interval=0 every write purges; the revoked "live" stays until it expires
+            rotated = await tokens.rotate(b"live", b"next", now + timedelta(days=1))
+            async with db.connection() as conn:
+                cur = await conn.execute("SELECT token_hash FROM refresh_tokens ORDER BY token_id")
+                left = [bytes(row[0]) for row in await cur.fetchall()]
+            return rotated, left, await tokens.purge_expired()
+        finally:
+            await db.close_pool()
+
+    rotated, left, purged_again = asyncio.run(run())
+
+    assert rotated is not None
+    assert left == [b"live", b"next"]
+    assert purged_again == 0
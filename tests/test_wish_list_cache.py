@@ -0,0 +1,199 @@
+import asyncio
+
+import pytest
+from conftest import versioned_wish, wish_create, wish_update
+from fastapi import HTTPException
+
+from src.domain.models import VersionedWishList, WishListPage
+from src.infrastructure.persistence import db, migrations
+from src.infrastructure.persistence.notifications import WISH_LIST_CHANNEL, NotificationListener
+from src.infrastructure.persistence.wish_list import WishListStorage
+from src.infrastructure.wish_list_cache import InMemoryWishListCache, NullWishListCache
+from src.use_cases.wish_list import WishListService
+
+OWNER_ID = 1
+WISH_ID = 10
+
+
+async def _load() -> VersionedWishList:
+    return versioned_wish(WISH_ID, OWNER_ID)
+
+
+class CountingWishesStorage:
+    def __init__(self) -> None:
+        self.version = 1
+        self.reads = 0
+
+    async def get_versioned(self, wish_id, user_id, known_versions=None):
+        self.reads += 1
+        if wish_id != WISH_ID or user_id != OWNER_ID:
+            return None
+        if self.version in (known_versions or ()):
+            return VersionedWishList(self.version, None)
+        return versioned_wish(WISH_ID, OWNER_ID, self.version)
+
+    async def get_by_id(self, wish_id):
+        return versioned_wish(WISH_ID, OWNER_ID).wish if wish_id == WISH_ID else None
+
+    async def get_all_by_user_id(self, user_id, maxPrice=None, after_id=None, limit=None):
+        self.reads += 1
+        return []
+
+    async def update(self, wish_id, user_id, wish, expected_versions=None):
+        self.version += 1
+        return self.version
+
+
+def test_service_reads_through_and_invalidates_on_write():
+    storage = CountingWishesStorage()
+    service = WishListService(storage, None, InMemoryWishListCache(100, 60))
+
+    async def run():
+        first = await service.get_versioned(WISH_ID, OWNER_ID)
+        not_modified = await service.get_versioned(WISH_ID, OWNER_ID, [first.version])
+        await service.get_all_by_user_id(OWNER_ID)
+        await service.get_all_by_user_id(OWNER_ID)
+        reads_before_write = storage.reads
+        await service.update(WISH_ID, wish_update(), OWNER_ID)
+        after = await service.get_versioned(WISH_ID, OWNER_ID)
+        await service.get_all_by_user_id(OWNER_ID)
+        return first, not_modified, reads_before_write, after
+
+    first, not_modified, reads_before_write, after = asyncio.run(run())
+
+    assert first.version == 1 and not_modified.wish is None
+    assert reads_before_write == 2  # one wish, one page
+    assert after.version == 2 and after.wish is not None
+    assert storage.reads == 4
+    stats = service._cache.stats()
+    assert stats["wishes"]["hits"] == 1 and stats["pages"]["hits"] == 1
+
+
+def test_cached_wish_is_not_served_to_another_user():
+    service = WishListService(CountingWishesStorage(), None, InMemoryWishListCache(100, 60))
+
+    async def run():
+        await service.get_versioned(WISH_ID, OWNER_ID)
+        await service.get_versioned(WISH_ID, OWNER_ID + 1)
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(run())
+    assert exc.value.status_code == 403
+
+
+def test_load_racing_an_invalidation_is_not_stored():
+    cache = InMemoryWishListCache(100, 60)
+
+    async def run():
+        async def slow_load():
+            await asyncio.sleep(0.01)
+            return versioned_wish(WISH_ID, OWNER_ID, 1)
+
+        loading = asyncio.create_task(cache.get_wish(WISH_ID, slow_load))
+        await asyncio.sleep(0)
+        await cache.invalidate(WISH_ID)
+        await loading
+
+        async def fresh_load():
+            return versioned_wish(WISH_ID, OWNER_ID, 2)
+
+        return await cache.get_wish(WISH_ID, fresh_load)
+
+    assert asyncio.run(run()).version == 2
+
+
+def test_entries_expire_and_notifications_invalidate(clock):
+    cache = InMemoryWishListCache(100, 30, clock=clock)
+    page = WishListPage([], None)
+
+    async def load_page():
+        return page
+
+    async def run():
+        await cache.get_wish(WISH_ID, _load)
+        await cache.get_page(OWNER_ID, ("q",), load_page)
+        cache.on_notify(f"{WISH_ID}:")
+        await cache.get_page(OWNER_ID, ("q",), load_page)
+        clock.now += 31
+        await cache.get_page(OWNER_ID, ("q",), load_page)
+        cache.on_notify(f":{OWNER_ID}")
+
+    asyncio.run(run())
+
+    stats = cache.stats()
+    assert stats["entries"] == 0 and stats["items"] == 0
+    assert stats["pages"] == {"hits": 1, "misses": 2, "hit_ratio": 0.3333}
+
+
+def test_wishes_and_pages_share_one_item_budget():
+    cache = InMemoryWishListCache(10, 60)
+    wish = versioned_wish(WISH_ID, OWNER_ID)  # the wish and one note: 2 items
+    page = WishListPage([wish.wish] * 4, None)  # 5 items
+
+    async def load_page():
+        return page
+
+    async def run():
+        await cache.get_wish(WISH_ID, _load)
+        await cache.get_page(OWNER_ID, ("a",), load_page)
+        before = cache.stats()
+        await cache.get_page(OWNER_ID, ("b",), load_page)
+        return before, cache.stats()
+
+    before, after = asyncio.run(run())
+
+    assert before["items"] == 7 and before["entries"] == 2
+    # the user's two pages weigh 10: the least recently used wish makes room
+    assert after["items"] == 10 and after["entries"] == 1
+
+
+def test_null_cache_always_loads():
+    cache = NullWishListCache()
+    calls = []
+
+    async def load():
+        calls.append(1)
+        return versioned_wish(WISH_ID, OWNER_ID)
+
+    async def run():
+        await cache.get_wish(WISH_ID, load)
+        await cache.get_wish(WISH_ID, load)
+
+    asyncio.run(run())
+
+    assert len(calls) == 2
+    assert cache.stats() == {"enabled": False}
+
+
+def test_storage_writes_invalidate_other_processes(postgres_schema):
+    storage = WishListStorage()
+    cache = InMemoryWishListCache(100, 60)
+    listener = NotificationListener(WISH_LIST_CHANNEL, cache.on_notify, cache.clear)
+
+    async def settled(condition) -> bool:
+        for _ in range(50):
+            if condition():
+                return True
+            await asyncio.sleep(0.05)
+        return False
+
+    async def load_page():
+        return WishListPage([], None)
+
+    async def run():
+        try:
+            await migrations.run_migrations()
+            await listener.start()
+            await asyncio.wait_for(listener.wait_listening(), 5)
+            await cache.get_page(OWNER_ID, ("q",), load_page)
+            wish_id = await storage.create_with_notes(wish_create(OWNER_ID), [])
+            page_dropped = await settled(lambda: cache.stats()["entries"] == 0)
+            await cache.get_wish(wish_id, _load)
+            await storage.update(wish_id, OWNER_ID, wish_update())
+            wish_dropped = await settled(lambda: cache.stats()["entries"] == 0)
+            return page_dropped, wish_dropped
+        finally:
+            await listener.stop()
+            await db.close_pool()
+
+    assert asyncio.run(run()) == (True, True)
@@ -0,0 +1,92 @@
+import asyncio
+from decimal import Decimal
+
+import pytest
+from conftest import note_update
+from fastapi import HTTPException
+
+from src.domain.entities import WishList
+from src.domain.errors import WishVersionMismatchError
+from src.domain.models import WishNoteUpdate
+from src.use_cases.wish_list import WishListService
+
+OWNER_ID = 1
+WISH_ID = 10
+
+
+class FakeWishesStorage:
+    async def get_by_id(self, wish_id: int) -> WishList | None:
+        if wish_id != WISH_ID:
+            return None
+        return WishList(WISH_ID, OWNER_ID, "title", "description", Decimal("10"), None)
+
+
+class FakeNotesStorage:
+    def __init__(self, note_ids: set[int], version: int = 1) -> None:
+        self.note_ids = note_ids
+        self.version = version
+
+    def _bump(self, wish_id: int, user_id: int, expected_versions: list[int] | None) -> bool:
+        if wish_id != WISH_ID or user_id != OWNER_ID:
+            return False
+        if expected_versions is not None and self.version not in expected_versions:
+            return False
+        self.version += 1
+        return True
+
+    async def delete_many(
+        self, wish_id: int, user_id: int, note_ids: list[int], expected_versions=None
+    ) -> tuple[int | None, set[int]]:
+        if not self._bump(wish_id, user_id, expected_versions):
+            return None, set()
+        deleted = self.note_ids & set(note_ids)
+        self.note_ids -= deleted
+        return self.version, deleted
+
+    async def update_many(
+        self, wish_id: int, user_id: int, notes: list[WishNoteUpdate], expected_versions=None
+    ) -> tuple[int | None, set[int]]:
+        if not self._bump(wish_id, user_id, expected_versions):
+            return None, set()
+        return self.version, self.note_ids & {note.wish_note_id for note in notes}
+
+
+def _service(note_ids: set[int]) -> WishListService:
+    return WishListService(FakeWishesStorage(), FakeNotesStorage(note_ids))
+
+
+def test_delete_notes_reports_per_id_results():
+    service = _service({1, 2})
+    version, results = asyncio.run(service.delete_notes(WISH_ID, [1, 3], OWNER_ID))
+    assert results == {1: True, 3: False}
+    assert version == 2
+
+
+def test_update_notes_reports_per_id_results():
+    service = _service({1, 2})
+    _, results = asyncio.run(
+        service.update_notes(WISH_ID, [note_update(2), note_update(5)], OWNER_ID)
+    )
+    assert results == {2: True, 5: False}
+
+
+def test_notes_of_foreign_wish_are_forbidden():
+    service = _service({1})
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(service.delete_notes(WISH_ID, [1], OWNER_ID + 1))
+    assert exc.value.status_code == 403
+
+
+def test_notes_of_missing_wish_are_not_found():
+    service = _service({1})
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(service.update_notes(WISH_ID + 1, [note_update(1)], OWNER_ID))
+    assert exc.value.status_code == 404
+
+
+def test_notes_write_with_stale_version_is_rejected():
+    service = _service({1})
+    with pytest.raises(WishVersionMismatchError):
+        asyncio.run(service.delete_notes(WISH_ID, [1], OWNER_ID, expected_versions=[0]))
+    version, results = asyncio.run(service.delete_notes(WISH_ID, [1], OWNER_ID, [0, 1]))
+    assert (version, results) == (2, {1: True})
@@ -0,0 +1,104 @@
+import asyncio
+
+from conftest import note_create, note_update, versioned_wish, wish_create, wish_update
+from fastapi.testclient import TestClient
+
+from src.app.main import app
+from src.domain.entities import WishNote
+from src.domain.models import VersionedWishList
+from src.infrastructure.persistence import db, migrations
+from src.infrastructure.persistence.wish_list import WishListStorage, WishNotesStorage
+from src.presentation.controllers.wish_list import _versions
+from src.presentation.dependencies import get_current_user_id, get_wish_list_service
+
+OWNER_ID = 7
+
+
+def test_versions_skip_notes_and_reject_stale_writes(postgres_schema):
+    wishes, notes = WishListStorage(), WishNotesStorage()
+
+    async def run():
+        try:
+            await migrations.run_migrations()
+            wish_id = await wishes.create_with_notes(wish_create(OWNER_ID), [note_create("a")])
+            fresh = await wishes.get_versioned(wish_id, OWNER_ID)
+            unchanged = await wishes.get_versioned(wish_id, OWNER_ID, [fresh.version])
+            stale = await wishes.update(wish_id, OWNER_ID, wish_update("x"), [fresh.version + 1])
+            updated = await wishes.update(wish_id, OWNER_ID, wish_update("y"), [fresh.version])
+            foreign = await notes.create_many(wish_id, OWNER_ID + 1, [note_create("b")])
+            added = await notes.create_many(wish_id, OWNER_ID, [note_create("b")], [updated])
+            changed = await wishes.get_versioned(wish_id, OWNER_ID, [fresh.version, updated])
+            return fresh, unchanged, stale, updated, foreign, added, changed
+        finally:
+            await db.close_pool()
+
+    fresh, unchanged, stale, updated, foreign, added, changed = asyncio.run(run())
+
+    assert fresh.version == 1 and [n.title for n in fresh.wish.notes] == ["a"]
+    assert unchanged.version == 1 and unchanged.wish is None
+    assert stale is None
+    assert updated == 2
+    assert foreign == (None, [])
+    assert added[0] == 3 and len(added[1]) == 1
+    assert changed.version == 3 and [n.title for n in changed.wish.notes] == ["a", "b"]
+
+
+def test_concurrent_editors_of_one_version_cannot_both_win(postgres_schema):
+    wishes, notes = WishListStorage(), WishNotesStorage()
+
+    async def run():
+        try:
+            await migrations.run_migrations()
+            wish_id = await wishes.create_with_notes(wish_create(OWNER_ID), [note_create("a")])
+            note_id = (await wishes.get_detailed(wish_id, OWNER_ID)).notes[0].wish_note_id
+
+            results = await asyncio.gather(
+                *(
+                    notes.update_many(wish_id, OWNER_ID, [note_update(note_id, f"t{i}")], [1])
+                    for i in range(5)
+                )
+            )
+            return results, await wishes.get_versioned(wish_id, OWNER_ID)
+        finally:
+            await db.close_pool()
+
+    results, final = asyncio.run(run())
+
+    winners = [result for result in results if result[0] is not None]
+    assert len(winners) == 1
+    assert final.version == 2
+
+
+def test_versions_parses_entity_tags():
+    assert _versions(None) is None
+    assert _versions("*") is None
+    assert _versions('"3"') == [3]
+    assert _versions('W/"3", "4" ,"x", 5, ""') == [3, 4]
+
+
+class _VersionThreeService:
+    def __init__(self, wish) -> None:
+        self.wish = wish
+
+    async def get_versioned(self, wish_id, user_id, known_versions=None):
+        return VersionedWishList(3, None if 3 in (known_versions or ()) else self.wish)
+
+
+def test_not_modified_carries_the_validator_of_the_compressed_response():
+    wish = versioned_wish(10, OWNER_ID).wish
+    wish.notes = [WishNote(i, 10, "the same words again", "", False) for i in range(100)]
+    app.dependency_overrides[get_current_user_id] = lambda: OWNER_ID
+    app.dependency_overrides[get_wish_list_service] = lambda: _VersionThreeService(wish)
+    try:
+        client = TestClient(app)
+        full = client.get("/api/wishes/10", headers={"Accept-Encoding": "gzip"})
+        cached = client.get(
+            "/api/wishes/10",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": full.headers["etag"]},
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert full.headers["content-encoding"] == "gzip"
+    assert cached.status_code == 304
+    assert full.headers["etag"] == cached.headers["etag"] == 'W/"3"'